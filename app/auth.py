@@ -1,8 +1,10 @@
 """Authentication module for x-rh-identity header handling."""
 import base64
-import json
 import logging
+from functools import lru_cache
 from typing import Tuple
+
+import orjson
 from fastapi import HTTPException, Header
 
 from app.schemas import IdentityHeader
@@ -16,48 +18,115 @@ class AuthenticationError(Exception):
     pass
 
 
-def decode_identity_header(x_rh_identity: str) -> IdentityHeader:
+def _load_identity_dict(x_rh_identity: str) -> dict:
     """
-    Decode and parse x-rh-identity header.
+    Decode base64 x-rh-identity header and parse its JSON payload.
 
     Args:
         x_rh_identity: Base64-encoded identity header value
 
     Returns:
-        Parsed IdentityHeader object
+        Parsed identity dictionary
 
     Raises:
-        AuthenticationError: If header is invalid or malformed
+        AuthenticationError: If header is missing or cannot be decoded
     """
     if not x_rh_identity:
         raise AuthenticationError("Missing x-rh-identity header")
 
     try:
-        # Decode base64
-        decoded_bytes = base64.b64decode(x_rh_identity)
-        decoded_str = decoded_bytes.decode("utf-8")
-
-        # Parse JSON
-        identity_dict = json.loads(decoded_str)
-
-        # Validate with Pydantic
-        identity = IdentityHeader(**identity_dict)
-
-        return identity
+        # orjson parses the decoded bytes directly, without a UTF-8 str copy
+        return orjson.loads(base64.b64decode(x_rh_identity))
 
     except base64.binascii.Error as e:
         logger.error(f"Failed to decode base64 identity header: {e}")
         raise AuthenticationError("Invalid base64 encoding in x-rh-identity header")
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse identity JSON: {e}")
         raise AuthenticationError("Invalid JSON in x-rh-identity header")
 
+    except Exception as e:
+        logger.error(f"Failed to decode identity header: {e}")
+        raise AuthenticationError(f"Invalid identity header format: {str(e)}")
+
+
+def _validate_identity_dict(identity_dict: dict) -> IdentityHeader:
+    """
+    Validate parsed identity dictionary with Pydantic.
+
+    Args:
+        identity_dict: Parsed identity dictionary
+
+    Returns:
+        Parsed IdentityHeader object
+
+    Raises:
+        AuthenticationError: If the structure is invalid
+    """
+    try:
+        return IdentityHeader(**identity_dict)
+
     except Exception as e:
         logger.error(f"Failed to validate identity header: {e}")
         raise AuthenticationError(f"Invalid identity header format: {str(e)}")
 
 
+def decode_identity_header(x_rh_identity: str) -> IdentityHeader:
+    """
+    Decode and parse x-rh-identity header.
+
+    Args:
+        x_rh_identity: Base64-encoded identity header value
+
+    Returns:
+        Parsed IdentityHeader object
+
+    Raises:
+        AuthenticationError: If header is invalid or malformed
+    """
+    return _validate_identity_dict(_load_identity_dict(x_rh_identity))
+
+
+@lru_cache(maxsize=1024)
+def resolve_identity(x_rh_identity: str) -> Tuple[int, str]:
+    """
+    Decode x-rh-identity header into org_id and account_number.
+
+    Results are memoized by the raw header value, since clients reuse the
+    same header across many requests. The cache is bounded so distinct
+    headers cannot grow it without limit; failures are not cached.
+
+    Well-formed payloads are read directly; anything else goes through
+    full Pydantic validation so errors are reported consistently.
+
+    Args:
+        x_rh_identity: Base64-encoded identity header value
+
+    Returns:
+        Tuple of (org_id as int, account_number as str)
+
+    Raises:
+        AuthenticationError: If header is invalid or malformed
+        ValueError: If org_id is not numeric
+    """
+    identity_dict = _load_identity_dict(x_rh_identity)
+
+    try:
+        payload = identity_dict["identity"]
+        org_id = payload["org_id"]
+        account_number = payload["account_number"]
+    except (KeyError, TypeError):
+        org_id = account_number = None
+
+    if not isinstance(org_id, str) or not isinstance(account_number, str):
+        identity = _validate_identity_dict(identity_dict)
+        org_id = identity.identity.org_id
+        account_number = identity.identity.account_number
+
+    return int(org_id), account_number
+
+
 def get_identity(
     x_rh_identity: str = Header(..., alias="x-rh-identity")
 ) -> Tuple[int, str]:
@@ -74,9 +143,7 @@ def get_identity(
         HTTPException: If authentication fails
     """
     try:
-        identity = decode_identity_header(x_rh_identity)
-        org_id = int(identity.identity.org_id)
-        account_number = identity.identity.account_number
+        org_id, account_number = resolve_identity(x_rh_identity)
 
         logger.debug(f"Authenticated request for org_id={org_id}, account={account_number}")
 
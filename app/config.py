@@ -1,5 +1,7 @@
 """Application configuration management."""
 from functools import lru_cache
+from typing import Any
+from pydantic import PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -32,17 +34,23 @@ class Settings(BaseSettings):
         case_sensitive=False
     )
 
+    _database_url: str = PrivateAttr(default="")
+
+    def model_post_init(self, __context: Any) -> None:
+        """Precompute derived settings once after loading."""
+        self._database_url = (
+            f"postgresql://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        )
+
     @property
     def database_url(self) -> str:
         """
-        Construct database URL from components.
+        Get database URL constructed from components.
 
         :return: PostgreSQL connection URL
         """
-        return (
-            f"postgresql://{self.postgres_user}:{self.postgres_password}"
-            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
-        )
+        return self._database_url
 
 
 @lru_cache()
@@ -5,16 +5,72 @@ This module reads rule metadata from the content/ directory structure
 that matches the format used by insights-content-service.
 """
 import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 from pathlib import Path
 from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Map common impact strings in metadata to numeric values
+_IMPACT_MAP = {
+    "low": 1,
+    "medium": 2,
+    "high": 3,
+    "critical": 4,
+}
+
+# Display strings for numeric impact values
+IMPACT_STRINGS = {
+    1: "Low Impact",
+    2: "Medium Impact",
+    3: "High Impact",
+    4: "Critical Impact",
+}
+
+
+def _impact_from_string(value) -> int:
+    """
+    Map an impact string (or any other value) to its numeric level.
+
+    :param value: Impact value from metadata
+    :return: Numeric impact level, medium if unknown
+    """
+    return _IMPACT_MAP.get(str(value).lower(), 2)
+
+
+def _intern_tags(tags):
+    """
+    Intern tag strings, which repeat heavily across rules.
+
+    :param tags: Tags value from metadata
+    :return: The tags with interned strings if it is a list of strings,
+        otherwise the value unchanged
+    """
+    if isinstance(tags, list) and all(isinstance(tag, str) for tag in tags):
+        return [sys.intern(tag) for tag in tags]
+    return tags
+
+
+# Impact in metadata can be a dict, a number or a string; dispatch on type
+_IMPACT_HANDLERS = {
+    dict: lambda value: value.get("impact", 1),
+    int: int,
+    float: int,
+    bool: int,
+    str: _impact_from_string,
+}
+
 
 class YAMLContentParser:
     """Parser for extracting rule metadata from markdown/YAML content files."""
 
+    __slots__ = ("content_path",)
+
     def __init__(self, content_path: str = None):
         """
         Initialize the parser.
@@ -64,22 +120,54 @@ class YAMLContentParser:
         :param rule_type: Type of rules (external/internal)
         :return: List of rule content dictionaries
         """
-        rules_content = []
-
         # Each subdirectory is a rule
-        for rule_dir in rules_dir.iterdir():
-            if not rule_dir.is_dir() or rule_dir.name.startswith("."):
-                continue
+        rule_dirs = self._list_subdirectories(rules_dir)
 
-            try:
-                rule_content = self._parse_rule_directory(rule_dir, rule_type)
-                if rule_content:
-                    rules_content.extend(rule_content)
-            except Exception as e:
-                logger.warning(f"Failed to parse {rule_dir.name}: {e}")
+        # Rules are independent of each other, so parse them concurrently.
+        # Results are collected in directory order to keep output stable.
+        rules_content = []
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = executor.map(
+                lambda rule_dir: self._safe_parse_rule_directory(rule_dir, rule_type),
+                rule_dirs,
+            )
+            for rule_content in results:
+                rules_content.extend(rule_content)
 
         return rules_content
 
+    @staticmethod
+    def _list_subdirectories(directory: Path) -> List[Path]:
+        """
+        List non-hidden subdirectories of a directory.
+
+        Uses os.scandir so the entry type comes from the directory read
+        instead of a separate stat() per entry.
+
+        :param directory: Directory to list
+        :return: List of subdirectory paths
+        """
+        with os.scandir(directory) as entries:
+            return [
+                directory / entry.name
+                for entry in entries
+                if not entry.name.startswith(".") and entry.is_dir()
+            ]
+
+    def _safe_parse_rule_directory(self, rule_dir: Path, rule_type: str) -> List[Dict]:
+        """
+        Parse a single rule directory, logging and skipping failures.
+
+        :param rule_dir: Path to rule directory
+        :param rule_type: Type of rule (external/internal)
+        :return: List of rule content dictionaries, empty on failure
+        """
+        try:
+            return self._parse_rule_directory(rule_dir, rule_type) or []
+        except Exception as e:
+            logger.warning(f"Failed to parse {rule_dir.name}: {e}")
+            return []
+
     def _parse_rule_directory(self, rule_dir: Path, rule_type: str) -> List[Dict]:
         """
         Parse a single rule directory.
@@ -89,7 +177,8 @@ class YAMLContentParser:
         :return: List of rule content dictionaries (one per error key)
         """
         rule_name = rule_dir.name
-        module_name = f"ccx_rules_ocp.{rule_type}.rules.{rule_name}"
+        # Interned: these strings repeat across error keys and index lookups
+        module_name = sys.intern(f"ccx_rules_ocp.{rule_type}.rules.{rule_name}")
 
         # Read plugin.yaml
         plugin_file = rule_dir / "plugin.yaml"
@@ -97,18 +186,18 @@ class YAMLContentParser:
             logger.warning(f"No plugin.yaml found for {rule_name}")
             return []
 
-        with open(plugin_file, "r", encoding="utf-8") as f:
-            plugin_data = yaml.safe_load(f)
+        with open(plugin_file, "rb") as f:
+            plugin_data = yaml.load(f, Loader=Loader)
 
         # Get plugin metadata
         plugin_info = plugin_data.get("plugin", {})
 
         # Find all error key directories
-        error_key_dirs = [d for d in rule_dir.iterdir() if d.is_dir() and not d.name.startswith(".")]
+        error_key_dirs = self._list_subdirectories(rule_dir)
 
         rules = []
         for error_key_dir in error_key_dirs:
-            error_key = error_key_dir.name
+            error_key = sys.intern(error_key_dir.name)
 
             try:
                 content = self._parse_error_key_directory(error_key_dir)
@@ -116,19 +205,9 @@ class YAMLContentParser:
                 # Merge with plugin-level metadata
                 # Handle impact - can be a string or int in metadata
                 impact_value = content.get("impact", 1)
-                if isinstance(impact_value, dict):
-                    impact = impact_value.get("impact", 1)
-                elif isinstance(impact_value, (int, float)):
-                    impact = int(impact_value)
-                else:
-                    # String value - map common strings to numeric values
-                    impact_map = {
-                        "low": 1,
-                        "medium": 2,
-                        "high": 3,
-                        "critical": 4,
-                    }
-                    impact = impact_map.get(str(impact_value).lower(), 2)
+                impact = _IMPACT_HANDLERS.get(type(impact_value), _impact_from_string)(
+                    impact_value
+                )
 
                 rule_content = {
                     "rule_fqdn": module_name,
@@ -141,8 +220,9 @@ class YAMLContentParser:
                     "total_risk": content.get("total_risk", 1),
                     "likelihood": content.get("likelihood", 1),
                     "impact": impact,
+                    "impact_string": IMPACT_STRINGS.get(impact, "Medium Impact"),
                     "publish_date": content.get("publish_date", ""),
-                    "tags": content.get("tags", []),  # Store as list
+                    "tags": _intern_tags(content.get("tags", [])),
                 }
 
                 rules.append(rule_content)
@@ -164,16 +244,17 @@ class YAMLContentParser:
         # Read metadata.yaml if it exists
         metadata_file = error_key_dir / "metadata.yaml"
         if metadata_file.exists():
-            with open(metadata_file, "r", encoding="utf-8") as f:
-                metadata = yaml.safe_load(f)
+            with open(metadata_file, "rb") as f:
+                metadata = yaml.load(f, Loader=Loader)
                 if metadata:
                     content.update(metadata)
 
-        # Read markdown files
+        # Read markdown files (a missing file is skipped without a separate stat)
         for md_type in ["generic", "reason", "resolution", "more_info"]:
-            md_file = error_key_dir / f"{md_type}.md"
-            if md_file.exists():
-                with open(md_file, "r", encoding="utf-8") as f:
+            try:
+                with open(error_key_dir / f"{md_type}.md", "r", encoding="utf-8") as f:
                     content[md_type] = f.read().strip()
+            except FileNotFoundError:
+                continue
 
         return content
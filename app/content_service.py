@@ -5,13 +5,48 @@ This module provides content service functionality by reading markdown/YAML file
 directly from the rules-content directory, matching the behavior of the Go-based
 insights-content-service but implemented in Python.
 """
+import hashlib
 import logging
 from typing import Dict, Optional
 
-from app.content_parser_yaml import YAMLContentParser
+import orjson
+
+from app.content_parser_yaml import IMPACT_STRINGS, YAMLContentParser
 
 logger = logging.getLogger(__name__)
 
+# Fields exposed as rule hit template data, and their defaults
+_TEMPLATE_KEYS = (
+    "description",
+    "generic",
+    "reason",
+    "resolution",
+    "more_info",
+    "total_risk",
+    "likelihood",
+    "impact",
+    "publish_date",
+    "tags",
+)
+_TEMPLATE_DEFAULTS = ("", "", "", "", "", 1, 1, 1, None, ())
+
+# Template data for rule hits without content (shared, read-only)
+EMPTY_TEMPLATE_DATA = dict(zip(_TEMPLATE_KEYS, _TEMPLATE_DEFAULTS))
+
+# Separator for composite (rule_fqdn, error_key) index keys
+_KEY_SEPARATOR = "\x1f"
+
+
+def _content_key(rule_fqdn: str, error_key: str) -> str:
+    """
+    Build the index key for a rule and error key.
+
+    :param rule_fqdn: Fully qualified rule name
+    :param error_key: Error key
+    :return: Composite string key
+    """
+    return rule_fqdn + _KEY_SEPARATOR + error_key
+
 
 class ContentService:
     """
@@ -22,6 +57,15 @@ class ContentService:
     it in memory, just like the Go-based content-service does.
     """
 
+    __slots__ = (
+        "parser",
+        "_content_index",
+        "_template_index",
+        "_smart_proxy_rule_count",
+        "_smart_proxy_cache_bytes",
+        "_content_etag",
+    )
+
     def __init__(self, content_path: str = None):
         """
         Initialize content service.
@@ -29,8 +73,11 @@ class ContentService:
         :param content_path: Path to rules-content directory
         """
         self.parser = YAMLContentParser(content_path)
-        self._content_index: Dict[tuple, Dict] = {}
-        self._all_content: list = []
+        self._content_index: Dict[str, Dict] = {}
+        self._template_index: Dict[str, Dict] = {}
+        self._smart_proxy_rule_count: int = 0
+        self._smart_proxy_cache_bytes: bytes = b""
+        self._content_etag: str = ""
         self._load_content()
 
     def _load_content(self):
@@ -38,13 +85,15 @@ class ContentService:
         logger.info("Loading rule content from files...")
         all_rules = self.parser.parse_all_rules()
 
-        # Build index by (rule_fqdn, error_key)
+        # Build indexes by (rule_fqdn, error_key); both reference the same
+        # parsed strings
         for rule in all_rules:
-            key = (rule["rule_fqdn"], rule["error_key"])
+            key = _content_key(rule["rule_fqdn"], rule["error_key"])
             self._content_index[key] = rule
+            self._template_index[key] = self._build_template_data(rule)
 
-        # Store list of all content
-        self._all_content = all_rules
+        # Content is immutable after loading, so build the response once
+        self._build_smart_proxy_cache(all_rules)
 
         logger.info(f"Loaded {len(self._content_index)} rules into memory")
 
@@ -56,24 +105,77 @@ class ContentService:
         :param error_key: Error key
         :return: Rule content dictionary or None if not found
         """
-        key = (rule_fqdn, error_key)
-        content = self._content_index.get(key)
+        content = self._content_index.get(_content_key(rule_fqdn, error_key))
 
         if not content:
             logger.warning(f"Content not found for {rule_fqdn}:{error_key}")
 
         return content
 
-    def get_all_content_smart_proxy_format(self) -> list:
+    def get_template_data(self, rule_fqdn: str, error_key: str) -> Optional[Dict]:
+        """
+        Get pre-built rule hit template data for a rule and error key.
+
+        The returned dictionary is shared and must not be modified.
+
+        :param rule_fqdn: Fully qualified rule name
+        :param error_key: Error key
+        :return: Template data dictionary or None if not found
+        """
+        template_data = self._template_index.get(_content_key(rule_fqdn, error_key))
+
+        if template_data is None:
+            logger.warning(f"Content not found for {rule_fqdn}:{error_key}")
+
+        return template_data
+
+    @staticmethod
+    def _build_template_data(rule: Dict) -> Dict:
+        """
+        Project rule content onto the fields exposed in rule hit responses.
+
+        :param rule: Rule content dictionary
+        :return: Template data dictionary
+        """
+        return {
+            key: rule.get(key, default)
+            for key, default in zip(_TEMPLATE_KEYS, _TEMPLATE_DEFAULTS)
+        }
+
+    def get_smart_proxy_rule_count(self) -> int:
+        """
+        Get the number of rules in the smart-proxy content.
+
+        :return: Number of rule modules
+        """
+        return self._smart_proxy_rule_count
+
+    def get_all_content_smart_proxy_bytes(self) -> bytes:
+        """
+        Get the serialized content endpoint response body.
+
+        :return: JSON-encoded {"status": "ok", "content": [...]} payload
+        """
+        return self._smart_proxy_cache_bytes
+
+    def get_content_etag(self) -> str:
+        """
+        Get the entity tag of the serialized content response.
+
+        :return: Quoted ETag value derived from the response body hash
         """
-        Get all rule content in smart-proxy format.
+        return self._content_etag
 
-        :return: List of rules in smart-proxy nested format
+    def _build_smart_proxy_cache(self, all_rules: list):
+        """
+        Group loaded content into smart-proxy format and serialize it.
+
+        :param all_rules: List of parsed rule content dictionaries
         """
         # Group rules by python_module (rule_fqdn without the specific rule name)
         rules_by_module = {}
 
-        for rule in self._all_content:
+        for rule in all_rules:
             rule_fqdn = rule["rule_fqdn"]
             error_key = rule["error_key"]
 
@@ -99,7 +201,7 @@ class ContentService:
             rules_by_module[rule_fqdn]["error_keys"][error_key] = {
                 "metadata": {
                     "description": rule.get("description", ""),
-                    "impact": rule.get("impact_string", self._impact_to_string(rule.get("impact", 1))),
+                    "impact": rule.get("impact_string") or self._impact_to_string(rule.get("impact", 1)),
                     "likelihood": rule.get("likelihood", 1),
                     "publish_date": rule.get("publish_date", ""),
                     "status": "active",
@@ -114,7 +216,12 @@ class ContentService:
                 "HasReason": bool(rule.get("reason", "")),
             }
 
-        return list(rules_by_module.values())
+        self._smart_proxy_rule_count = len(rules_by_module)
+        self._smart_proxy_cache_bytes = orjson.dumps(
+            {"status": "ok", "content": list(rules_by_module.values())}
+        )
+        digest = hashlib.blake2b(self._smart_proxy_cache_bytes, digest_size=16)
+        self._content_etag = f'"{digest.hexdigest()}"'
 
     @staticmethod
     def _impact_to_string(impact: int) -> str:
@@ -124,13 +231,7 @@ class ContentService:
         :param impact: Numeric impact level (1-4)
         :return: String representation of impact level
         """
-        impact_map = {
-            1: "Low Impact",
-            2: "Medium Impact",
-            3: "High Impact",
-            4: "Critical Impact",
-        }
-        return impact_map.get(impact, "Medium Impact")
+        return IMPACT_STRINGS.get(impact, "Medium Impact")
 
 
 # Global content service instance (initialized once)
@@ -1,4 +1,5 @@
 """Database connection and session management."""
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
@@ -12,13 +13,27 @@ settings = get_settings()
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
+    # Replace connections before server or proxy idle timeouts close them
+    pool_recycle=3600,
+    # Pin PostgreSQL's default isolation level on every pooled connection
+    isolation_level="READ COMMITTED",
     pool_size=10,
     max_overflow=20,
+    # Batch executemany() calls into multi-row statements (psycopg2)
+    executemany_mode="values_plus_batch",
+    # Room for every upsert/query shape so statements compile only once
+    query_cache_size=1200,
+    # (De)serialize JSONB columns with orjson
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
     echo=settings.log_level == "DEBUG"
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit without being reloaded from the database
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 # Base class for declarative models
 Base = declarative_base()
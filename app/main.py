@@ -1,14 +1,18 @@
 """FastAPI application for Insights On Premise."""
-import json
+import asyncio
 import logging
 import os
+import shutil
 import tempfile
 import uuid
+from collections import defaultdict
 from datetime import datetime
-from typing import Tuple, Dict
+from typing import Any, Optional, Tuple, Dict
 
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Header
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 
 from app.auth import get_identity
@@ -25,7 +29,11 @@ from app.schemas import (
     ContentResponse,
     ContentRule,
 )
-from app.content_service import get_content_service
+from app.content_service import (
+    EMPTY_TEMPLATE_DATA,
+    ContentService,
+    get_content_service,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -36,11 +44,88 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Buffer size used when copying uploads to disk
+UPLOAD_COPY_BUFFER_SIZE = 4 * 1024 * 1024  # 4MB
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json module."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an uploaded file exceeds the maximum allowed size."""
+
+    pass
+
+
+class LimitedReader:
+    """File-like wrapper that raises once more than `limit` bytes are read."""
+
+    def __init__(self, fileobj, limit: int):
+        self.fileobj = fileobj
+        self.limit = limit
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read > self.limit:
+            raise UploadTooLargeError(self.bytes_read)
+        return data
+
+
+def save_upload(source, destination, limit: int) -> int:
+    """
+    Copy an uploaded file to destination, enforcing a maximum size.
+
+    When Starlette has already spooled the upload to disk, the data is
+    copied in-kernel with os.sendfile instead of through Python buffers.
+
+    Args:
+        source: Uploaded file object (SpooledTemporaryFile)
+        destination: Writable binary file object with a file descriptor
+        limit: Maximum allowed size in bytes
+
+    Returns:
+        Number of bytes copied
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds the limit
+        OSError: If the upload could not be copied completely
+    """
+    if getattr(source, "_rolled", False) and hasattr(os, "sendfile"):
+        source_fd = source.fileno()
+        total_size = os.fstat(source_fd).st_size
+        if total_size > limit:
+            raise UploadTooLargeError(total_size)
+
+        offset = 0
+        while offset < total_size:
+            sent = os.sendfile(destination.fileno(), source_fd, offset, total_size - offset)
+            if sent == 0:
+                # Never hand a truncated copy on to processing
+                raise OSError(
+                    f"Upload copy ended after {offset} of {total_size} bytes"
+                )
+            offset += sent
+        return offset
+
+    reader = LimitedReader(source, limit)
+    shutil.copyfileobj(reader, destination, UPLOAD_COPY_BUFFER_SIZE)
+    return reader.bytes_read
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Insights On-Premise",
     description="Red Hat Insights archive processing for on-premise deployment",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -53,19 +138,63 @@ async def startup_event():
     os.makedirs(settings.temp_upload_dir, exist_ok=True)
     logger.info(f"Temp upload directory: {settings.temp_upload_dir}")
 
-    # Initialize database
-    try:
-        init_db()
+    # Initialize database and content service (loads YAML/markdown files into
+    # memory, like content-service) concurrently, as both are slow and independent
+    db_result, content_service = await asyncio.gather(
+        asyncio.to_thread(init_db),
+        asyncio.to_thread(get_content_service),
+        return_exceptions=True,
+    )
+
+    if isinstance(db_result, Exception):
+        logger.error(f"Database initialization failed: {db_result}")
+    else:
         logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
 
-    # Initialize content service (loads YAML/markdown files into memory, like content-service)
-    try:
-        content_service = get_content_service()
+    if isinstance(content_service, Exception):
+        logger.error(
+            f"Failed to initialize content service: {content_service}",
+            exc_info=content_service,
+        )
+    else:
+        app.state.content_service = content_service
         logger.info("Content service initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize content service: {e}", exc_info=True)
+
+
+def content_service_dep(request: Request) -> ContentService:
+    """
+    FastAPI dependency providing the content service loaded at startup.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        ContentService instance
+    """
+    content_service = getattr(request.app.state, "content_service", None)
+    if content_service is None:
+        # Startup did not run (e.g. app used without lifespan events)
+        content_service = get_content_service()
+        request.app.state.content_service = content_service
+    return content_service
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches the given ETag.
+
+    Args:
+        if_none_match: If-None-Match header value (may list several tags)
+        etag: Current quoted ETag
+
+    Returns:
+        True if the client already has the current representation
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
 
 
 @app.get("/")
@@ -157,27 +286,22 @@ async def upload_archive(
         ) as temp_file:
             temp_file_path = temp_file.name
 
-            # Read and validate file size
-            chunk_size = 1024 * 1024  # 1MB chunks
-            total_size = 0
-
-            while True:
-                chunk = await upload.read(chunk_size)
-                if not chunk:
-                    break
-
-                total_size += len(chunk)
-
-                if total_size > settings.max_file_size:
-                    logger.warning(
-                        f"Request {request_id}: File too large ({total_size} bytes)"
-                    )
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes",
-                    )
+            # Copy upload to disk in a worker thread, enforcing the size limit
+            try:
+                if upload.size is not None and upload.size > settings.max_file_size:
+                    raise UploadTooLargeError(upload.size)
 
-                temp_file.write(chunk)
+                total_size = await run_in_threadpool(
+                    save_upload, upload.file, temp_file, settings.max_file_size
+                )
+            except UploadTooLargeError as e:
+                logger.warning(
+                    f"Request {request_id}: File too large ({e.args[0]} bytes)"
+                )
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes",
+                )
 
         logger.info(
             f"Request {request_id}: Saved uploaded file ({total_size} bytes) to {temp_file_path}"
@@ -232,9 +356,10 @@ async def upload_archive(
 
 @app.get(
     "/api/v1/clusters/reports",
-    response_model=ClustersReportResponse,
+    response_model=None,
     status_code=200,
     responses={
+        200: {"model": ClustersReportResponse, "description": "Successful Response"},
         401: {"model": ErrorResponse, "description": "Unauthorized"},
         500: {"model": ErrorResponse, "description": "Internal Server Error"},
     },
@@ -242,6 +367,7 @@ async def upload_archive(
 async def get_clusters_reports(
     identity: Tuple[int, str] = Depends(get_identity),
     db: Session = Depends(get_db),
+    content_service: ContentService = Depends(content_service_dep),
 ):
     """
     Retrieve reports for all clusters in the organization.
@@ -251,6 +377,7 @@ async def get_clusters_reports(
     Args:
         identity: Tuple of (org_id, account_number) from authentication
         db: Database session
+        content_service: In-memory rule content service
 
     Returns:
         ClustersReportResponse with report data for all clusters in the org
@@ -268,63 +395,43 @@ async def get_clusters_reports(
         # Query all reports for this organization
         reports = db.query(Report).filter_by(org_id=org_id).all()
 
+        # Query all rule hits for the organization at once and group them by
+        # cluster (no join needed - use in-memory content)
+        hits_by_cluster = defaultdict(list)
+        rule_hits_query = (
+            db.query(RuleHit)
+            .filter(RuleHit.org_id == org_id)
+            .with_entities(
+                RuleHit.cluster_id,
+                RuleHit.rule_fqdn,
+                RuleHit.error_key,
+                RuleHit.updated_at,
+            )
+        )
+        for hit in rule_hits_query:
+            hits_by_cluster[hit.cluster_id].append(hit)
+
         for report in reports:
             cluster_id = report.cluster
+            rule_hits = hits_by_cluster.get(cluster_id, [])
 
-            # Query rule hits for this cluster (no join needed - use in-memory content)
-            rule_hits = (
-                db.query(RuleHit)
-                .filter(RuleHit.org_id == org_id, RuleHit.cluster_id == cluster_id)
-                .all()
-            )
-
-            # Parse report JSON
-            try:
-                report_data = json.loads(report.report)
-            except json.JSONDecodeError:
-                logger.warning(
-                    f"Failed to parse report JSON for cluster {cluster_id}"
-                )
-                report_data = {}
+            # Report is stored as a JSON document and loaded as a dict
+            report_data = report.report or {}
 
             # Build rule hits response with content from content service
-            content_service = get_content_service()
             rule_hits_response = []
 
             for hit in rule_hits:
                 # Get content from content service (serves from files, like insights-content-service)
-                content_data = content_service.get_content(hit.rule_fqdn, hit.error_key)
-
-                if content_data:
-                    template_data = {
-                        "description": content_data.get("description", ""),
-                        "generic": content_data.get("generic", ""),
-                        "reason": content_data.get("reason", ""),
-                        "resolution": content_data.get("resolution", ""),
-                        "more_info": content_data.get("more_info", ""),
-                        "total_risk": content_data.get("total_risk", 1),
-                        "likelihood": content_data.get("likelihood", 1),
-                        "impact": content_data.get("impact", 1),
-                        "publish_date": content_data.get("publish_date"),
-                        "tags": content_data.get("tags", []),
-                    }
-                else:
+                template_data = content_service.get_template_data(
+                    hit.rule_fqdn, hit.error_key
+                )
+                if template_data is None:
                     # Content not found - use empty template
-                    template_data = {
-                        "description": "",
-                        "generic": "",
-                        "reason": "",
-                        "resolution": "",
-                        "more_info": "",
-                        "total_risk": 1,
-                        "likelihood": 1,
-                        "impact": 1,
-                        "publish_date": None,
-                        "tags": [],
-                    }
+                    template_data = EMPTY_TEMPLATE_DATA
 
                 rule_hits_response.append(
-                    RuleHitResponse(
+                    RuleHitResponse.model_construct(
                         rule_fqdn=hit.rule_fqdn,
                         error_key=hit.error_key,
                         template_data=template_data,
@@ -332,8 +439,9 @@ async def get_clusters_reports(
                     )
                 )
 
-            # Build cluster report
-            clusters_data[cluster_id] = ClusterReport(
+            # Build cluster report (data comes from our own DB and content
+            # service, so skip Pydantic validation)
+            clusters_data[cluster_id] = ClusterReport.model_construct(
                 cluster_id=cluster_id,
                 org_id=org_id,
                 report=report_data,
@@ -345,10 +453,15 @@ async def get_clusters_reports(
 
         logger.info(f"Successfully fetched {len(clusters_data)} cluster reports")
 
-        return ClustersReportResponse(
+        # Serialize directly; the response is not re-validated by FastAPI
+        response = ClustersReportResponse.model_construct(
             status="ok",
             clusters=clusters_data,
         )
+        return Response(
+            content=response.model_dump_json(),
+            media_type="application/json",
+        )
 
     except Exception as e:
         logger.error(f"Error fetching cluster reports: {e}", exc_info=True)
@@ -360,13 +473,17 @@ async def get_clusters_reports(
 
 @app.get(
     "/api/v1/content",
-    response_model=ContentResponse,
+    response_model=None,
     status_code=200,
     responses={
+        200: {"model": ContentResponse, "description": "Successful Response"},
         500: {"model": ErrorResponse, "description": "Internal Server Error"},
     },
 )
-async def get_content():
+async def get_content(
+    content_service: ContentService = Depends(content_service_dep),
+    if_none_match: Optional[str] = Header(None, alias="if-none-match"),
+):
     """
     Retrieve all available rule content metadata.
 
@@ -377,6 +494,13 @@ async def get_content():
     This on-premise deployment serves content directly from markdown/YAML files
     (loaded into memory at startup), just like insights-content-service does.
 
+    Content only changes on restart, so responses carry an ETag and
+    requests with a matching If-None-Match header get 304 Not Modified.
+
+    Args:
+        content_service: In-memory rule content service
+        if_none_match: Optional If-None-Match header
+
     Returns:
         ContentResponse with list of rule content metadata
 
@@ -386,15 +510,19 @@ async def get_content():
     logger.info("Fetching all rule content metadata")
 
     try:
-        # Get all content from content service in smart-proxy format
-        content_service = get_content_service()
-        all_content = content_service.get_all_content_smart_proxy_format()
-
-        logger.info(f"Successfully fetched metadata for {len(all_content)} rules")
-
-        return ContentResponse(
-            status="ok",
-            content=all_content,
+        etag = content_service.get_content_etag()
+        if if_none_match and etag_matches(if_none_match, etag):
+            logger.info("Rule content not modified")
+            return Response(status_code=304, headers={"ETag": etag})
+
+        rules_count = content_service.get_smart_proxy_rule_count()
+        logger.info(f"Successfully fetched metadata for {rules_count} rules")
+
+        # Response body is pre-serialized at load time
+        return Response(
+            content=content_service.get_all_content_smart_proxy_bytes(),
+            media_type="application/json",
+            headers={"ETag": etag},
         )
 
     except Exception as e:
@@ -408,12 +536,16 @@ async def get_content():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
     """Custom handler for HTTP exceptions."""
-    return JSONResponse(
+    return Response(
         status_code=exc.status_code,
-        content=ErrorResponse(
-            error=exc.detail,
-            request_id=request.headers.get("x-rh-insights-request-id"),
-        ).dict(),
+        content=orjson.dumps(
+            {
+                "error": exc.detail,
+                "request_id": request.headers.get("x-rh-insights-request-id"),
+                "detail": None,
+            }
+        ),
+        media_type="application/json",
     )
 
 
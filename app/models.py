@@ -1,11 +1,100 @@
 """Database models for Insights On Premise."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, BigInteger, DateTime, PrimaryKeyConstraint
-from sqlalchemy.dialects.postgresql import VARCHAR, insert
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import (
+    JSON,
+    Column,
+    String,
+    BigInteger,
+    DateTime,
+    PrimaryKeyConstraint,
+    Text,
+    delete,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from sqlalchemy.orm import Session
 
 from app.database import Base
 
+# JSON documents are stored as JSONB on PostgreSQL (plain JSON elsewhere,
+# e.g. SQLite in tests)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def _upsert_statement(model, constraint: str, update_columns: Tuple[str, ...]):
+    """
+    Build an INSERT ... ON CONFLICT DO UPDATE statement for a model.
+
+    The statement carries no values; rows are supplied as execution
+    parameters, so one statement serves every call and compiles only once.
+
+    Args:
+        model: Model class to insert into
+        constraint: Name of the conflicting unique constraint
+        update_columns: Columns overwritten from the new row on conflict
+
+    Returns:
+        Insert statement with an ON CONFLICT DO UPDATE clause
+    """
+    stmt = insert(model)
+    return stmt.on_conflict_do_update(
+        constraint=constraint,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+
+
+@lru_cache(maxsize=None)
+def _returning_statement(stmt, model):
+    """
+    Get an upsert statement extended with RETURNING of the written row.
+
+    Upsert statements are built once per model, so their RETURNING
+    variants are built once too rather than on every fetching call.
+
+    Args:
+        stmt: INSERT ... ON CONFLICT statement
+        model: Model class the statement inserts into
+
+    Returns:
+        The statement with a RETURNING clause for the model
+    """
+    return stmt.returning(model)
+
+
+def _execute_upsert(
+    db: Session, model, stmt, params: Dict, fetch: bool, commit: bool
+):
+    """
+    Execute an upsert statement, optionally committing.
+
+    Args:
+        db: Database session
+        model: Model class the statement inserts into
+        stmt: INSERT ... ON CONFLICT statement
+        params: Values of the row to write
+        fetch: Whether to return the written row
+        commit: Whether to commit the transaction
+
+    Returns:
+        The written model instance if fetch is True, otherwise None
+    """
+    result = None
+    if fetch:
+        # Return the row from the same round-trip via RETURNING
+        result = db.scalars(
+            _returning_statement(stmt, model),
+            params,
+            execution_options={"populate_existing": True},
+        ).one()
+    else:
+        db.execute(stmt, params)
+
+    if commit:
+        db.commit()
+    return result
+
 
 class Report(Base):
     """
@@ -16,9 +105,9 @@ class Report(Base):
 
     __tablename__ = "report"
 
-    org_id = Column(Integer, nullable=False)
-    cluster = Column(VARCHAR, nullable=False, unique=True)
-    report = Column(VARCHAR, nullable=False)
+    org_id = Column(BigInteger, nullable=False)
+    cluster = Column(Text, nullable=False, unique=True)
+    report = Column(JSONDocument, nullable=False)
     reported_at = Column(DateTime, nullable=True)
     last_checked_at = Column(DateTime, nullable=True)
     kafka_offset = Column(BigInteger, default=0)
@@ -34,9 +123,12 @@ class Report(Base):
         db: Session,
         org_id: int,
         cluster: str,
-        report: str,
+        report: Dict,
         gathered_at: datetime = None,
-    ) -> "Report":
+        fetch: bool = False,
+        commit: bool = True,
+        now: datetime = None,
+    ) -> Optional["Report"]:
         """
         Insert or update a report atomically using PostgreSQL's ON CONFLICT.
 
@@ -44,46 +136,93 @@ class Report(Base):
             db: Database session
             org_id: Organization ID
             cluster: Cluster identifier
-            report: Report JSON data
+            report: Report data
             gathered_at: When the report was gathered
+            fetch: Whether to return the written row
+            commit: Whether to commit; pass False to batch into a larger transaction
+            now: Timestamp to record; defaults to the current UTC time
 
         Returns:
-            The created or updated Report instance
-        """
-        now = datetime.utcnow()
-
-        # Prepare insert statement with ON CONFLICT DO UPDATE
-        stmt = insert(cls).values(
-            org_id=org_id,
-            cluster=cluster,
-            report=report,
-            reported_at=now,
-            last_checked_at=now,
-            gathered_at=gathered_at or now,
-            kafka_offset=0,
-        )
+            The created or updated Report instance if fetch is True, otherwise None
+        """
+        now = now or datetime.utcnow()
 
-        # On conflict, update the report and timestamps
         # Keep reported_at from original insert, update gathered_at if provided
-        update_dict = {
-            "report": stmt.excluded.report,
-            "last_checked_at": stmt.excluded.last_checked_at,
+        stmt = (
+            cls._UPSERT_STMT if gathered_at else cls._UPSERT_KEEP_GATHERED_AT_STMT
+        )
+        params = {
+            "org_id": org_id,
+            "cluster": cluster,
+            "report": report,
+            "reported_at": now,
+            "last_checked_at": now,
+            "gathered_at": gathered_at or now,
+            "kafka_offset": 0,
         }
-        if gathered_at:
-            update_dict["gathered_at"] = stmt.excluded.gathered_at
 
-        stmt = stmt.on_conflict_do_update(
-            constraint="report_pkey",
-            set_=update_dict,
+        return _execute_upsert(db, cls, stmt, params, fetch, commit)
+
+    @classmethod
+    def upsert_many(
+        cls,
+        db: Session,
+        org_id: int,
+        reports: Dict[str, Dict],
+        gathered_at: datetime = None,
+        commit: bool = True,
+        now: datetime = None,
+    ) -> int:
+        """
+        Insert or update reports for many clusters in a single ON CONFLICT statement.
+
+        Args:
+            db: Database session
+            org_id: Organization ID
+            reports: Report data keyed by cluster identifier
+            gathered_at: When the reports were gathered
+            commit: Whether to commit; pass False to batch into a larger transaction
+            now: Timestamp to record; defaults to the current UTC time
+
+        Returns:
+            Number of reports written
+        """
+        if not reports:
+            return 0
+
+        now = now or datetime.utcnow()
+
+        # As in upsert, keep the stored gathered_at unless one is provided
+        stmt = (
+            cls._UPSERT_STMT if gathered_at else cls._UPSERT_KEEP_GATHERED_AT_STMT
         )
+        db.execute(
+            stmt,
+            [
+                {
+                    "org_id": org_id,
+                    "cluster": cluster,
+                    "report": report,
+                    "reported_at": now,
+                    "last_checked_at": now,
+                    "gathered_at": gathered_at or now,
+                    "kafka_offset": 0,
+                }
+                for cluster, report in reports.items()
+            ],
+        )
+        if commit:
+            db.commit()
 
-        # Execute the statement
-        db.execute(stmt)
-        db.commit()
+        return len(reports)
 
-        # Fetch and return the record
-        result = db.query(cls).filter_by(org_id=org_id, cluster=cluster).one()
-        return result
+
+Report._UPSERT_STMT = _upsert_statement(
+    Report, "report_pkey", ("report", "last_checked_at", "gathered_at")
+)
+Report._UPSERT_KEEP_GATHERED_AT_STMT = _upsert_statement(
+    Report, "report_pkey", ("report", "last_checked_at")
+)
 
 
 class RuleHit(Base):
@@ -96,15 +235,15 @@ class RuleHit(Base):
 
     __tablename__ = "rule_hit"
 
-    org_id = Column(Integer, nullable=False)
-    cluster_id = Column(VARCHAR, nullable=False)
-    rule_fqdn = Column(VARCHAR, nullable=False)
-    error_key = Column(VARCHAR, nullable=False)
+    org_id = Column(BigInteger, nullable=False)
+    cluster_id = Column(Text, nullable=False)
+    rule_fqdn = Column(Text, nullable=False)
+    error_key = Column(Text, nullable=False)
     updated_at = Column(DateTime, nullable=True)
 
     __table_args__ = (
         PrimaryKeyConstraint(
-            "cluster_id", "org_id", "rule_fqdn", "error_key", name="rule_hit_pkey"
+            "org_id", "cluster_id", "rule_fqdn", "error_key", name="rule_hit_pkey"
         ),
     )
 
@@ -116,7 +255,10 @@ class RuleHit(Base):
         cluster_id: str,
         rule_fqdn: str,
         error_key: str,
-    ) -> "RuleHit":
+        fetch: bool = False,
+        commit: bool = True,
+        now: datetime = None,
+    ) -> Optional["RuleHit"]:
         """
         Insert or update a rule hit atomically using PostgreSQL's ON CONFLICT.
 
@@ -126,48 +268,191 @@ class RuleHit(Base):
             cluster_id: Cluster identifier
             rule_fqdn: Fully qualified rule name
             error_key: Error key for the rule
+            fetch: Whether to return the written row
+            commit: Whether to commit; pass False to batch into a larger transaction
+            now: Timestamp to record; defaults to the current UTC time
 
         Returns:
-            The created or updated RuleHit instance
+            The created or updated RuleHit instance if fetch is True, otherwise None
+        """
+        now = now or datetime.utcnow()
+
+        # On conflict, just update timestamp
+        params = {
+            "org_id": org_id,
+            "cluster_id": cluster_id,
+            "rule_fqdn": rule_fqdn,
+            "error_key": error_key,
+            "updated_at": now,
+        }
+
+        return _execute_upsert(db, cls, cls._UPSERT_STMT, params, fetch, commit)
+
+    @classmethod
+    def upsert_many(
+        cls,
+        db: Session,
+        org_id: int,
+        cluster_id: str,
+        hits: List[Dict],
+        commit: bool = True,
+        now: datetime = None,
+    ) -> int:
         """
-        now = datetime.utcnow()
+        Insert or update many rule hits in a single ON CONFLICT statement.
 
-        # Prepare insert statement with ON CONFLICT DO UPDATE
-        stmt = insert(cls).values(
-            org_id=org_id,
-            cluster_id=cluster_id,
-            rule_fqdn=rule_fqdn,
-            error_key=error_key,
-            updated_at=now,
+        Args:
+            db: Database session
+            org_id: Organization ID
+            cluster_id: Cluster identifier
+            hits: Rule hit dictionaries with rule_fqdn and error_key
+            commit: Whether to commit; pass False to batch into a larger transaction
+            now: Timestamp to record; defaults to the current UTC time
+
+        Returns:
+            Number of rule hits written
+        """
+        return cls.upsert_many_for_clusters(
+            db, org_id, {cluster_id: hits}, commit=commit, now=now
         )
 
-        # On conflict, just update timestamp
-        stmt = stmt.on_conflict_do_update(
-            constraint="rule_hit_pkey",
-            set_={
-                "updated_at": stmt.excluded.updated_at,
-            },
+    @classmethod
+    def upsert_many_for_clusters(
+        cls,
+        db: Session,
+        org_id: int,
+        hits_by_cluster: Dict[str, List[Dict]],
+        commit: bool = True,
+        now: datetime = None,
+    ) -> int:
+        """
+        Insert or update rule hits of many clusters in a single ON CONFLICT statement.
+
+        Args:
+            db: Database session
+            org_id: Organization ID
+            hits_by_cluster: Rule hit dictionaries with rule_fqdn and error_key,
+                keyed by cluster identifier
+            commit: Whether to commit; pass False to batch into a larger transaction
+            now: Timestamp to record; defaults to the current UTC time
+
+        Returns:
+            Number of rule hits written
+        """
+        # A single ON CONFLICT statement cannot touch the same row twice,
+        # so drop duplicate hits first
+        keys = dict.fromkeys(
+            (cluster_id, hit["rule_fqdn"], hit["error_key"])
+            for cluster_id, hits in hits_by_cluster.items()
+            for hit in hits
         )
+        if not keys:
+            return 0
+
+        now = now or datetime.utcnow()
+
+        # Execute the statement once for all rows; they are sent as
+        # executemany parameters, so the statement compiles the same way
+        # regardless of how many hits there are
+        db.execute(
+            cls._UPSERT_STMT,
+            [
+                {
+                    "org_id": org_id,
+                    "cluster_id": cluster_id,
+                    "rule_fqdn": rule_fqdn,
+                    "error_key": error_key,
+                    "updated_at": now,
+                }
+                for cluster_id, rule_fqdn, error_key in keys
+            ],
+        )
+        if commit:
+            db.commit()
 
-        # Execute the statement
-        db.execute(stmt)
-        db.commit()
+        return len(keys)
+
+    @classmethod
+    def delete_stale(
+        cls,
+        db: Session,
+        org_id: int,
+        cluster_id: str,
+        hits: List[Dict],
+        commit: bool = True,
+    ) -> int:
+        """
+        Delete rule hits for a cluster that are not among the current hits.
+
+        Args:
+            db: Database session
+            org_id: Organization ID
+            cluster_id: Cluster identifier
+            hits: Current rule hit dictionaries with rule_fqdn and error_key
+            commit: Whether to commit; pass False to batch into a larger transaction
 
-        # Fetch and return the record
-        result = (
-            db.query(cls)
-            .filter_by(
-                org_id=org_id,
-                cluster_id=cluster_id,
-                rule_fqdn=rule_fqdn,
-                error_key=error_key,
+        Returns:
+            Number of rows deleted
+        """
+        stmt = delete(cls).where(cls.org_id == org_id, cls.cluster_id == cluster_id)
+        if hits:
+            stmt = stmt.where(
+                tuple_(cls.rule_fqdn, cls.error_key).not_in(
+                    [(hit["rule_fqdn"], hit["error_key"]) for hit in hits]
+                )
             )
-            .one()
+
+        count = db.execute(stmt).rowcount
+        if commit:
+            db.commit()
+        return count
+
+    @classmethod
+    def delete_stale_for_clusters(
+        cls,
+        db: Session,
+        org_id: int,
+        hits_by_cluster: Dict[str, List[Dict]],
+        commit: bool = True,
+    ) -> int:
+        """
+        Delete rule hits of many clusters that are not among their current hits.
+
+        Args:
+            db: Database session
+            org_id: Organization ID
+            hits_by_cluster: Current rule hit dictionaries with rule_fqdn and
+                error_key, keyed by cluster identifier
+            commit: Whether to commit; pass False to batch into a larger transaction
+
+        Returns:
+            Number of rows deleted
+        """
+        if not hits_by_cluster:
+            return 0
+
+        stmt = delete(cls).where(
+            cls.org_id == org_id, cls.cluster_id.in_(list(hits_by_cluster))
         )
-        return result
+        current = [
+            (cluster_id, hit["rule_fqdn"], hit["error_key"])
+            for cluster_id, hits in hits_by_cluster.items()
+            for hit in hits
+        ]
+        if current:
+            stmt = stmt.where(
+                tuple_(cls.cluster_id, cls.rule_fqdn, cls.error_key).not_in(current)
+            )
+
+        count = db.execute(stmt).rowcount
+        if commit:
+            db.commit()
+        return count
 
     @classmethod
-    def delete_for_cluster(cls, db: Session, org_id: int, cluster_id: str) -> int:
+    def delete_for_cluster(
+        cls, db: Session, org_id: int, cluster_id: str, commit: bool = True
+    ) -> int:
         """
         Delete all rule hits for a cluster.
 
@@ -175,6 +460,7 @@ class RuleHit(Base):
             db: Database session
             org_id: Organization ID
             cluster_id: Cluster identifier
+            commit: Whether to commit; pass False to batch into a larger transaction
 
         Returns:
             Number of rows deleted
@@ -182,10 +468,14 @@ class RuleHit(Base):
         count = (
             db.query(cls).filter_by(org_id=org_id, cluster_id=cluster_id).delete()
         )
-        db.commit()
+        if commit:
+            db.commit()
         return count
 
 
+RuleHit._UPSERT_STMT = _upsert_statement(RuleHit, "rule_hit_pkey", ("updated_at",))
+
+
 class ReportInfo(Base):
     """
     Table storing metadata about reports.
@@ -195,9 +485,9 @@ class ReportInfo(Base):
 
     __tablename__ = "report_info"
 
-    org_id = Column(Integer, nullable=False)
-    cluster_id = Column(VARCHAR, nullable=False, unique=True)
-    version_info = Column(VARCHAR, nullable=False)
+    org_id = Column(BigInteger, nullable=False)
+    cluster_id = Column(Text, nullable=False, unique=True)
+    version_info = Column(JSONDocument, nullable=False)
 
     __table_args__ = (
         PrimaryKeyConstraint("org_id", "cluster_id", name="report_info_pkey"),
@@ -205,8 +495,14 @@ class ReportInfo(Base):
 
     @classmethod
     def upsert(
-        cls, db: Session, org_id: int, cluster_id: str, version_info: str
-    ) -> "ReportInfo":
+        cls,
+        db: Session,
+        org_id: int,
+        cluster_id: str,
+        version_info: Dict,
+        fetch: bool = False,
+        commit: bool = True,
+    ) -> Optional["ReportInfo"]:
         """
         Insert or update report info atomically using PostgreSQL's ON CONFLICT.
 
@@ -214,28 +510,62 @@ class ReportInfo(Base):
             db: Database session
             org_id: Organization ID
             cluster_id: Cluster identifier
-            version_info: Version information JSON
+            version_info: Version information
+            fetch: Whether to return the written row
+            commit: Whether to commit; pass False to batch into a larger transaction
 
         Returns:
-            The created or updated ReportInfo instance
+            The created or updated ReportInfo instance if fetch is True, otherwise None
         """
-        # Prepare insert statement with ON CONFLICT DO UPDATE
-        stmt = insert(cls).values(
-            org_id=org_id,
-            cluster_id=cluster_id,
-            version_info=version_info,
-        )
-
         # On conflict, update version_info
-        stmt = stmt.on_conflict_do_update(
-            constraint="report_info_pkey",
-            set_={"version_info": stmt.excluded.version_info},
+        params = {
+            "org_id": org_id,
+            "cluster_id": cluster_id,
+            "version_info": version_info,
+        }
+
+        return _execute_upsert(db, cls, cls._UPSERT_STMT, params, fetch, commit)
+
+    @classmethod
+    def upsert_many(
+        cls,
+        db: Session,
+        org_id: int,
+        version_infos: Dict[str, Dict],
+        commit: bool = True,
+    ) -> int:
+        """
+        Insert or update report info for many clusters in a single ON CONFLICT statement.
+
+        Args:
+            db: Database session
+            org_id: Organization ID
+            version_infos: Version information keyed by cluster identifier
+            commit: Whether to commit; pass False to batch into a larger transaction
+
+        Returns:
+            Number of rows written
+        """
+        if not version_infos:
+            return 0
+
+        db.execute(
+            cls._UPSERT_STMT,
+            [
+                {
+                    "org_id": org_id,
+                    "cluster_id": cluster_id,
+                    "version_info": version_info,
+                }
+                for cluster_id, version_info in version_infos.items()
+            ],
         )
+        if commit:
+            db.commit()
+
+        return len(version_infos)
 
-        # Execute the statement
-        db.execute(stmt)
-        db.commit()
 
-        # Fetch and return the record
-        result = db.query(cls).filter_by(org_id=org_id, cluster_id=cluster_id).one()
-        return result
+ReportInfo._UPSERT_STMT = _upsert_statement(
+    ReportInfo, "report_info_pkey", ("version_info",)
+)
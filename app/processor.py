@@ -1,11 +1,14 @@
 """Insights-core archive processing module."""
-import json
 import logging
 import os
+import re
+import tarfile
+import zipfile
 from datetime import datetime
+from functools import lru_cache
 from io import StringIO
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
 import yaml
 
 from sqlalchemy.orm import Session
@@ -24,6 +27,29 @@ settings = get_settings()
 
 Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
+# Trivially empty formatter output (e.g. when all components failed),
+# recognized without running the parser
+_EMPTY_RESULTS = {"{}": dict, "[]": list}
+_EMPTY_RESULTS_MAX_LEN = 8
+
+# Default for optional pre-parsed results, as None means "not JSON"
+_NOT_PARSED = object()
+
+# Result keys containing either word (in any case) are treated as rule hits
+_RULE_KEY_RE = re.compile(r"error|rule", re.IGNORECASE)
+
+# Rule content fields copied from insights-core results, with their defaults
+_STR_KEYS = ("description", "generic", "reason", "resolution", "more_info")
+_INT_KEYS = ("total_risk", "likelihood", "impact")
+
+# Content used for results that carry no rule metadata
+_FALLBACK_CONTENT = {
+    **dict.fromkeys(_STR_KEYS, ""),
+    **dict.fromkeys(_INT_KEYS, 1),
+    "publish_date": None,
+    "tags": "[]",
+}
+
 
 class ProcessingError(Exception):
     """Raised when archive processing fails."""
@@ -31,10 +57,39 @@ class ProcessingError(Exception):
     pass
 
 
+def parse_results(results_json: str) -> Optional[Any]:
+    """
+    Parse insights-core formatter output.
+
+    Args:
+        results_json: Raw output produced by the formatter
+
+    Returns:
+        Parsed results, or None if the output is empty or not valid JSON
+    """
+    if not results_json:
+        return None
+
+    if len(results_json) <= _EMPTY_RESULTS_MAX_LEN:
+        empty = _EMPTY_RESULTS.get(results_json.strip())
+        if empty is not None:
+            return empty()
+
+    try:
+        return orjson.loads(results_json)
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Failed to parse results JSON: {e}")
+        return None
+
+
+@lru_cache(maxsize=4)
 def load_insights_config(config_path: str = "config.yml") -> Dict:
     """
     Load insights-core configuration from YAML file.
 
+    Results are memoized per config path; callers must not modify the
+    returned dictionary.
+
     Args:
         config_path: Path to the YAML configuration file
 
@@ -81,7 +136,9 @@ def load_insights_components(config: Dict) -> None:
     plugins = config.get("plugins", {})
     packages = plugins.get("packages", [])
 
-    # Load each package using dr.load_components
+    # Load each package using dr.load_components; packages are loaded one
+    # at a time, as importing them registers components in insights-core's
+    # global (not thread-safe) registries
     loaded_packages = []
     failed_packages = []
 
@@ -135,15 +192,90 @@ def get_component_graphs(target_components: List[str]) -> Dict:
     return graph
 
 
+def directory_size(path: str, limit: int = -1) -> int:
+    """
+    Sum sizes of all files under a directory tree.
+
+    Uses os.scandir so entry types come from the directory listing, and
+    stops walking as soon as the running total reaches the limit.
+
+    Args:
+        path: Root directory
+        limit: Stop once the total reaches this many bytes (negative = no limit)
+
+    Returns:
+        Total size in bytes (possibly partial if the limit was reached)
+    """
+    total_size = 0
+    pending = [path]
+
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+
+                total_size += entry.stat(follow_symlinks=False).st_size
+                if 0 <= limit <= total_size:
+                    return total_size
+
+    return total_size
+
+
+def archive_content_size(archive_path: str, limit: int = -1) -> Optional[int]:
+    """
+    Sum sizes of the files stored in an archive without extracting it.
+
+    Only formats whose member sizes can be read without decompressing any
+    data are inspected: uncompressed tar archives are walked header by
+    header, seeking over member data, and zip archives are read from their
+    central directory. Compressed tar archives would have to be fully
+    decompressed here and then again by the extraction, so they are not
+    inspected. Stops as soon as the running total reaches the limit.
+
+    Args:
+        archive_path: Path to archive file
+        limit: Stop once the total reaches this many bytes (negative = no limit)
+
+    Returns:
+        Total size in bytes (possibly partial if the limit was reached), or
+        None if the archive format is not inspected
+    """
+    total_size = 0
+
+    try:
+        with tarfile.open(archive_path, mode="r:") as archive:
+            for member in archive:
+                total_size += member.size
+                if 0 <= limit <= total_size:
+                    break
+        return total_size
+    except tarfile.ReadError:
+        pass
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                total_size += info.file_size
+                if 0 <= limit <= total_size:
+                    break
+        return total_size
+
+    return None
+
+
 class ArchiveProcessor:
     """
     Handles processing of Red Hat Insights archives.
     Implementation matches ccx-data-pipeline's approach.
     """
 
-    # Class-level configuration cache
+    # Class-level configuration and component graph cache
     _config = None
     _config_loaded = False
+    _components_dict = None
+    _target_components = None
 
     def __init__(
         self, db: Session, org_id: int, config_path: str = "config.yml"
@@ -159,11 +291,8 @@ class ArchiveProcessor:
         self.db = db
         self.org_id = org_id
 
-        # Load configuration (cached at class level)
-        if not ArchiveProcessor._config_loaded:
-            ArchiveProcessor._config = load_insights_config(config_path)
-            load_insights_components(ArchiveProcessor._config)
-            ArchiveProcessor._config_loaded = True
+        # Load configuration and components (cached at class level)
+        ArchiveProcessor._ensure_components_loaded(config_path)
 
         self.config = ArchiveProcessor._config
         self.service_config = self.config.get("service", {})
@@ -173,16 +302,8 @@ class ArchiveProcessor:
         self.Formatter = dr.get_component(formatter_name) or HumanReadableFormat
 
         # Setup target components
-        target_components = self.service_config.get("target_components", [])
-        if target_components:
-            self.components_dict = get_component_graphs(target_components)
-        else:
-            # Use all single-node components if none specified
-            self.components_dict = dr.determine_components(
-                dr.COMPONENTS[dr.GROUPS.single]
-            )
-
-        self.target_components = dr.toposort_flatten(self.components_dict, sort=False)
+        self.components_dict = ArchiveProcessor._components_dict
+        self.target_components = ArchiveProcessor._target_components
 
         # Extraction settings
         self.extract_timeout = self.service_config.get("extract_timeout", 300)
@@ -197,6 +318,72 @@ class ArchiveProcessor:
             f"Processor initialized with {len(self.target_components)} components"
         )
 
+    @classmethod
+    def _ensure_components_loaded(cls, config_path: str) -> None:
+        """
+        Load configuration, components and the sorted component graph once.
+
+        The dependency graph and its topological order only depend on the
+        configuration, so they are computed once per process and shared by
+        all processor instances.
+
+        Args:
+            config_path: Path to insights configuration YAML file
+        """
+        if cls._config_loaded:
+            return
+
+        config = load_insights_config(config_path)
+        load_insights_components(config)
+
+        target_components = config.get("service", {}).get("target_components", [])
+        if target_components:
+            components_dict = get_component_graphs(target_components)
+        else:
+            # Use all single-node components if none specified
+            components_dict = dr.determine_components(
+                dr.COMPONENTS[dr.GROUPS.single]
+            )
+
+        cls._config = config
+        cls._components_dict = components_dict
+        cls._target_components = dr.toposort_flatten(components_dict, sort=False)
+        cls._config_loaded = True
+
+    def validate_archive_size(self, archive_path: str) -> bool:
+        """
+        Validate unpacked size of an archive before extracting it.
+
+        Lets oversized archives be rejected without writing their contents
+        to the extraction directory. validate_size still checks the
+        extracted tree, which also covers formats not inspected here
+        (e.g. compressed tar archives).
+
+        Args:
+            archive_path: Path to archive file
+
+        Returns:
+            True if size is acceptable or unknown, False otherwise
+        """
+        if self.unpacked_archive_size_limit < 0:
+            return True
+
+        try:
+            total_size = archive_content_size(
+                archive_path, self.unpacked_archive_size_limit
+            )
+        except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile) as e:
+            logger.warning(f"Could not inspect archive before extraction: {e}")
+            return True
+
+        if total_size is not None and total_size >= self.unpacked_archive_size_limit:
+            logger.warning(
+                f"Archive content exceeds limit: {total_size} >= {self.unpacked_archive_size_limit}"
+            )
+            return False
+
+        return True
+
     def validate_size(self, extraction_path: str) -> bool:
         """
         Validate unpacked archive size.
@@ -211,7 +398,7 @@ class ArchiveProcessor:
             logger.debug("No size limitation for unpacked archive")
             return True
 
-        total_size = sum(p.stat().st_size for p in Path(extraction_path).rglob("*"))
+        total_size = directory_size(extraction_path, self.unpacked_archive_size_limit)
 
         if total_size >= self.unpacked_archive_size_limit:
             logger.warning(
@@ -246,8 +433,8 @@ class ArchiveProcessor:
             metadata_path = os.path.join(extraction_path, metadata_file)
             if os.path.exists(metadata_path):
                 try:
-                    with open(metadata_path, "r") as f:
-                        metadata = json.load(f)
+                    with open(metadata_path, "rb") as f:
+                        metadata = orjson.loads(f.read())
                         if "cluster_id" in metadata:
                             return metadata["cluster_id"]
                 except Exception as e:
@@ -257,7 +444,7 @@ class ArchiveProcessor:
 
     def process_with_insights_core(
         self, archive_path: str
-    ) -> Tuple[str, str, Dict]:
+    ) -> Tuple[str, str, Dict, Optional[Any]]:
         """
         Process archive with insights-core using ccx-data-pipeline approach.
 
@@ -265,7 +452,8 @@ class ArchiveProcessor:
             archive_path: Path to archive file
 
         Returns:
-            Tuple of (cluster_id, results_json, version_info)
+            Tuple of (cluster_id, results_json, version_info, results) where
+            results is the parsed results_json, or None if it is not JSON
 
         Raises:
             ProcessingError: If processing fails
@@ -273,6 +461,12 @@ class ArchiveProcessor:
         try:
             logger.info(f"Processing archive: {archive_path}")
 
+            # Reject oversized archives before writing anything to disk
+            if not self.validate_archive_size(archive_path):
+                raise ProcessingError(
+                    f"Archive exceeds size limit: {self.unpacked_archive_size_limit}"
+                )
+
             # Use insights.core.archives.extract() like ccx-data-pipeline
             with extract(
                 archive_path,
@@ -313,18 +507,18 @@ class ArchiveProcessor:
                     "components_count": len(self.target_components),
                 }
 
-                return cluster_id, result, version_info
+                return cluster_id, result, version_info, parse_results(result)
 
         except Exception as e:
             logger.error(f"insights-core processing failed: {e}", exc_info=True)
             raise ProcessingError(f"Analysis failed: {str(e)}")
 
-    def extract_rule_hits(self, results_json: str) -> List[Dict]:
+    def extract_rule_hits(self, results: Optional[Any]) -> List[Dict]:
         """
         Extract rule hits from insights-core results.
 
         Args:
-            results_json: JSON string from insights-core
+            results: Parsed insights-core results (see parse_results)
 
         Returns:
             List of rule hit dictionaries with rule_fqdn, error_key, and content metadata
@@ -332,13 +526,10 @@ class ArchiveProcessor:
         rule_hits = []
 
         try:
-            # Parse JSON results
-            if not results_json or results_json == "{}":
+            if not results:
                 logger.info("No results to parse")
                 return rule_hits
 
-            results = json.loads(results_json)
-
             # Extract rules based on format
             # The format depends on the Formatter used
             # For JsonFormat, results typically contain component outputs
@@ -346,34 +537,16 @@ class ArchiveProcessor:
             # This is a simplified extraction - adjust based on actual format
             if isinstance(results, dict):
                 for key, value in results.items():
-                    if "error" in key.lower() or "rule" in key.lower():
+                    if _RULE_KEY_RE.search(key):
                         # Extract content metadata from value
                         if isinstance(value, dict):
-                            content = {
-                                "description": value.get("description", ""),
-                                "generic": value.get("generic", ""),
-                                "reason": value.get("reason", ""),
-                                "resolution": value.get("resolution", ""),
-                                "more_info": value.get("more_info", ""),
-                                "total_risk": value.get("total_risk", 1),
-                                "likelihood": value.get("likelihood", 1),
-                                "impact": value.get("impact", 1),
-                                "publish_date": value.get("publish_date"),
-                                "tags": json.dumps(value.get("tags", [])),
-                            }
+                            content = {k: value.get(k, "") for k in _STR_KEYS}
+                            for k in _INT_KEYS:
+                                content[k] = value.get(k, 1)
+                            content["publish_date"] = value.get("publish_date")
+                            content["tags"] = orjson.dumps(value.get("tags", [])).decode()
                         else:
-                            content = {
-                                "description": str(value),
-                                "generic": "",
-                                "reason": "",
-                                "resolution": "",
-                                "more_info": "",
-                                "total_risk": 1,
-                                "likelihood": 1,
-                                "impact": 1,
-                                "publish_date": None,
-                                "tags": "[]",
-                            }
+                            content = dict(_FALLBACK_CONTENT, description=str(value))
 
                         rule_hits.append(
                             {
@@ -385,73 +558,199 @@ class ArchiveProcessor:
 
             logger.info(f"Extracted {len(rule_hits)} rule hits")
 
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse results JSON: {e}")
         except Exception as e:
             logger.warning(f"Error extracting rule hits: {e}")
 
         return rule_hits
 
-    def save_results(
+    def prepare_report(
         self,
         cluster_id: str,
         results_json: str,
-        version_info: Dict,
-    ) -> int:
+        results: Optional[Any] = _NOT_PARSED,
+        now: datetime = None,
+    ) -> Tuple[List[Dict], Dict]:
         """
-        Save processing results to database.
+        Extract rule hits and build the report document for a cluster.
 
         Args:
             cluster_id: Cluster identifier
             results_json: JSON results from insights-core
-            version_info: Version information dictionary
+            results: Already parsed results_json (None if it is not JSON);
+                parsed here when omitted
+            now: Processing timestamp; defaults to the current UTC time
 
         Returns:
-            Number of rule hits saved
+            Tuple of (rule hits, report data)
         """
+        if results is _NOT_PARSED:
+            results = parse_results(results_json)
+
         # Extract rule hits from results
-        rule_hits = self.extract_rule_hits(results_json)
+        rule_hits = self.extract_rule_hits(results)
 
-        # Save main report
+        # Build main report; JSON output is stored as a nested document,
+        # anything else (e.g. text formatter output) as a string
         report_data = {
             "cluster_id": cluster_id,
             "rule_count": len(rule_hits),
-            "processed_at": datetime.utcnow().isoformat(),
-            "results": results_json,
+            "processed_at": (now or datetime.utcnow()).isoformat(),
+            "results": results_json if results is None else results,
         }
 
-        Report.upsert(
-            self.db,
-            org_id=self.org_id,
-            cluster=cluster_id,
-            report=json.dumps(report_data),
-            gathered_at=datetime.utcnow(),
+        return rule_hits, report_data
+
+    def save_results(
+        self,
+        cluster_id: str,
+        results_json: str,
+        version_info: Dict,
+        results: Optional[Any] = _NOT_PARSED,
+    ) -> int:
+        """
+        Save processing results to database.
+
+        Args:
+            cluster_id: Cluster identifier
+            results_json: JSON results from insights-core
+            version_info: Version information dictionary
+            results: Already parsed results_json (None if it is not JSON);
+                parsed here when omitted
+
+        Returns:
+            Number of rule hits saved
+        """
+        # Use one timestamp for every row written by this save
+        now = datetime.utcnow()
+
+        rule_hits, report_data = self.prepare_report(
+            cluster_id, results_json, results, now=now
         )
 
-        # Clear existing rule hits for this cluster
-        RuleHit.delete_for_cluster(self.db, self.org_id, cluster_id)
+        # Write everything in a single transaction, committed once
+        try:
+            Report.upsert(
+                self.db,
+                org_id=self.org_id,
+                cluster=cluster_id,
+                report=report_data,
+                gathered_at=now,
+                fetch=False,
+                commit=False,
+                now=now,
+            )
 
-        # Save new rule hits (just references - content served from files)
-        for hit in rule_hits:
-            RuleHit.upsert(
+            # Save current rule hits (just references - content served from
+            # files); existing rows are updated in place rather than re-inserted
+            RuleHit.upsert_many(
                 self.db,
                 org_id=self.org_id,
                 cluster_id=cluster_id,
-                rule_fqdn=hit["rule_fqdn"],
-                error_key=hit["error_key"],
+                hits=rule_hits,
+                commit=False,
+                now=now,
             )
 
-        # Save report info
-        ReportInfo.upsert(
-            self.db,
-            org_id=self.org_id,
-            cluster_id=cluster_id,
-            version_info=json.dumps(version_info),
-        )
+            # Remove rule hits that are no longer reported for this cluster
+            RuleHit.delete_stale(
+                self.db,
+                org_id=self.org_id,
+                cluster_id=cluster_id,
+                hits=rule_hits,
+                commit=False,
+            )
+
+            # Save report info
+            ReportInfo.upsert(
+                self.db,
+                org_id=self.org_id,
+                cluster_id=cluster_id,
+                version_info=version_info,
+                fetch=False,
+                commit=False,
+            )
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
 
         logger.info(f"Saved {len(rule_hits)} rule hits for cluster {cluster_id}")
         return len(rule_hits)
 
+    def save_results_batch(
+        self, batch: List[Tuple[str, str, Dict]]
+    ) -> Dict[str, int]:
+        """
+        Save processing results of many archives in a single transaction.
+
+        Reports, rule hits and report info of all clusters are each written
+        with one statement, amortizing round-trips and the commit across the
+        batch. When a cluster appears more than once, its last results win.
+
+        Args:
+            batch: Tuples of (cluster_id, results_json, version_info)
+
+        Returns:
+            Number of rule hits saved, keyed by cluster identifier
+        """
+        # Use one timestamp for every row written by this batch
+        now = datetime.utcnow()
+
+        reports = {}
+        hits_by_cluster = {}
+        version_infos = {}
+        for cluster_id, results_json, version_info in batch:
+            rule_hits, report_data = self.prepare_report(
+                cluster_id, results_json, now=now
+            )
+            reports[cluster_id] = report_data
+            hits_by_cluster[cluster_id] = rule_hits
+            version_infos[cluster_id] = version_info
+
+        if not reports:
+            return {}
+
+        try:
+            Report.upsert_many(
+                self.db,
+                org_id=self.org_id,
+                reports=reports,
+                gathered_at=now,
+                commit=False,
+                now=now,
+            )
+            RuleHit.upsert_many_for_clusters(
+                self.db,
+                org_id=self.org_id,
+                hits_by_cluster=hits_by_cluster,
+                commit=False,
+                now=now,
+            )
+            RuleHit.delete_stale_for_clusters(
+                self.db,
+                org_id=self.org_id,
+                hits_by_cluster=hits_by_cluster,
+                commit=False,
+            )
+            ReportInfo.upsert_many(
+                self.db,
+                org_id=self.org_id,
+                version_infos=version_infos,
+                commit=False,
+            )
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        logger.info(f"Saved results for {len(reports)} clusters in one batch")
+        return {
+            cluster_id: len(rule_hits)
+            for cluster_id, rule_hits in hits_by_cluster.items()
+        }
+
     def process_archive(self, archive_path: str) -> Tuple[str, int]:
         """
         Main processing function - extract, analyze, and save archive.
@@ -468,12 +767,17 @@ class ArchiveProcessor:
         logger.info(f"Starting archive processing: {archive_path}")
 
         # Process with insights-core (ccx-data-pipeline approach)
-        cluster_id, results_json, version_info = self.process_with_insights_core(
-            archive_path
-        )
+        (
+            cluster_id,
+            results_json,
+            version_info,
+            results,
+        ) = self.process_with_insights_core(archive_path)
 
         # Save to database
-        rules_count = self.save_results(cluster_id, results_json, version_info)
+        rules_count = self.save_results(
+            cluster_id, results_json, version_info, results=results
+        )
 
         logger.info(f"Completed processing for cluster {cluster_id}")
         return cluster_id, rules_count
@@ -0,0 +1,53 @@
+"""store report documents as jsonb
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Convert JSON text columns to JSONB
+    op.alter_column(
+        'report', 'report',
+        type_=postgresql.JSONB(),
+        existing_type=sa.VARCHAR(),
+        existing_nullable=False,
+        postgresql_using='report::jsonb'
+    )
+    op.alter_column(
+        'report_info', 'version_info',
+        type_=postgresql.JSONB(),
+        existing_type=sa.VARCHAR(),
+        existing_nullable=False,
+        postgresql_using='version_info::jsonb'
+    )
+
+
+def downgrade() -> None:
+    # Convert JSONB columns back to JSON text
+    op.alter_column(
+        'report_info', 'version_info',
+        type_=sa.VARCHAR(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='version_info::text'
+    )
+    op.alter_column(
+        'report', 'report',
+        type_=sa.VARCHAR(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='report::text'
+    )
@@ -0,0 +1,28 @@
+"""drop indexes duplicating primary key prefixes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # org_id lookups are served by the leading column of report_pkey
+    # (org_id, cluster) and report_info_pkey (org_id, cluster_id)
+    op.drop_index('idx_report_org_id', table_name='report')
+    op.drop_index('idx_report_info_org_id', table_name='report_info')
+
+
+def downgrade() -> None:
+    # Recreate org_id indexes
+    op.create_index('idx_report_info_org_id', 'report_info', ['org_id'])
+    op.create_index('idx_report_org_id', 'report', ['org_id'])
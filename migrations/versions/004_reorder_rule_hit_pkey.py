@@ -0,0 +1,36 @@
+"""lead rule_hit primary key with org_id
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15 11:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rule hits are looked up by org_id, then cluster_id; with those
+    # leading the primary key it also covers idx_rule_hit_org_cluster
+    op.drop_constraint('rule_hit_pkey', 'rule_hit', type_='primary')
+    op.create_primary_key(
+        'rule_hit_pkey', 'rule_hit',
+        ['org_id', 'cluster_id', 'rule_fqdn', 'error_key']
+    )
+    op.drop_index('idx_rule_hit_org_cluster', table_name='rule_hit')
+
+
+def downgrade() -> None:
+    # Restore original primary key column order and org/cluster index
+    op.create_index('idx_rule_hit_org_cluster', 'rule_hit', ['org_id', 'cluster_id'])
+    op.drop_constraint('rule_hit_pkey', 'rule_hit', type_='primary')
+    op.create_primary_key(
+        'rule_hit_pkey', 'rule_hit',
+        ['cluster_id', 'org_id', 'rule_fqdn', 'error_key']
+    )
@@ -0,0 +1,71 @@
+"""use bigint org ids and text columns
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# org_id columns, widened as org ids can exceed 2^31
+ORG_ID_COLUMNS = [
+    ('report', 'org_id'),
+    ('rule_hit', 'org_id'),
+    ('report_info', 'org_id'),
+]
+
+# Unbounded VARCHAR columns, standardized on TEXT
+TEXT_COLUMNS = [
+    ('report', 'cluster'),
+    ('rule_hit', 'cluster_id'),
+    ('rule_hit', 'rule_fqdn'),
+    ('rule_hit', 'error_key'),
+    ('rule_hit', 'template_data'),
+    ('report_info', 'cluster_id'),
+]
+
+
+def upgrade() -> None:
+    # Widening integer columns rewrites the tables; VARCHAR to TEXT does not
+    for table, column in ORG_ID_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.BigInteger(),
+            existing_type=sa.Integer(),
+            existing_nullable=False
+        )
+
+    for table, column in TEXT_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.Text(),
+            existing_type=sa.VARCHAR(),
+            existing_nullable=False
+        )
+
+
+def downgrade() -> None:
+    for table, column in TEXT_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.VARCHAR(),
+            existing_type=sa.Text(),
+            existing_nullable=False
+        )
+
+    for table, column in ORG_ID_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.Integer(),
+            existing_type=sa.BigInteger(),
+            existing_nullable=False
+        )
@@ -0,0 +1,82 @@
+"""hash partition rule_hit by org_id
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+# Number of rule_hit hash partitions
+PARTITIONS = 16
+
+
+def _create_rule_hit_indexes() -> None:
+    op.create_index('idx_rule_hit_rule_fqdn', 'rule_hit', ['rule_fqdn'])
+
+
+def upgrade() -> None:
+    # Declarative partitioning is PostgreSQL-only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # An existing table cannot be partitioned in place: move it aside,
+    # create the partitioned table with the same columns and copy rows over
+    op.execute('ALTER TABLE rule_hit RENAME TO rule_hit_unpartitioned')
+    op.execute(
+        'ALTER TABLE rule_hit_unpartitioned '
+        'RENAME CONSTRAINT rule_hit_pkey TO rule_hit_unpartitioned_pkey'
+    )
+
+    op.execute(
+        'CREATE TABLE rule_hit (LIKE rule_hit_unpartitioned INCLUDING DEFAULTS) '
+        'PARTITION BY HASH (org_id)'
+    )
+    op.create_primary_key(
+        'rule_hit_pkey', 'rule_hit',
+        ['org_id', 'cluster_id', 'rule_fqdn', 'error_key']
+    )
+    for i in range(PARTITIONS):
+        op.execute(
+            f'CREATE TABLE rule_hit_p{i} PARTITION OF rule_hit '
+            f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {i})'
+        )
+
+    op.execute('INSERT INTO rule_hit SELECT * FROM rule_hit_unpartitioned')
+    op.drop_table('rule_hit_unpartitioned')
+
+    _create_rule_hit_indexes()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Copy rows back into a plain table
+    op.execute('ALTER TABLE rule_hit RENAME TO rule_hit_partitioned')
+    op.execute(
+        'ALTER TABLE rule_hit_partitioned '
+        'RENAME CONSTRAINT rule_hit_pkey TO rule_hit_partitioned_pkey'
+    )
+
+    op.execute(
+        'CREATE TABLE rule_hit (LIKE rule_hit_partitioned INCLUDING DEFAULTS)'
+    )
+    op.create_primary_key(
+        'rule_hit_pkey', 'rule_hit',
+        ['org_id', 'cluster_id', 'rule_fqdn', 'error_key']
+    )
+
+    op.execute('INSERT INTO rule_hit SELECT * FROM rule_hit_partitioned')
+    # Dropping the partitioned table drops its partitions and indexes
+    op.drop_table('rule_hit_partitioned')
+
+    _create_rule_hit_indexes()
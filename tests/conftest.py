@@ -1,45 +1,212 @@
 """Pytest configuration and fixtures."""
 import os
+import tempfile
+from functools import partial
+
+import httpx
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
 from app.main import app
 
 
-@pytest.fixture(scope="function")
-def test_db():
-    """Create a test database for each test."""
-    # Use in-memory SQLite for testing
-    SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False}
+def pytest_addoption(parser):
+    """Register options controlling the test database lifetime."""
+    group = parser.getgroup("database")
+    group.addoption(
+        "--reuse-db",
+        action="store_true",
+        default=False,
+        help="Keep the test database on disk between runs (in $TEST_DB_DIR, "
+        "default /dev/shm) and skip creating its schema when it already exists.",
+    )
+    group.addoption(
+        "--create-db",
+        action="store_true",
+        default=False,
+        help="Recreate the reused test database (e.g. after model changes).",
+    )
+
+
+def _persistent_db(config):
+    """Whether the test database outlives the test session."""
+    return config.getoption("reuse_db") or config.getoption("create_db")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Trade durability for speed; test databases are throwaway."""
+    # Let SQLAlchemy emit BEGIN itself (see _begin_transaction) so that
+    # SAVEPOINTs work with pysqlite
+    dbapi_connection.isolation_level = None
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _set_search_path(dbapi_connection, connection_record, schema):
+    """Resolve unqualified table names in the given PostgreSQL schema."""
+    # Outside a transaction, so the pool's reset-on-return doesn't undo it
+    autocommit = dbapi_connection.autocommit
+    dbapi_connection.autocommit = True
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'SET search_path TO "{schema}"')
+    cursor.close()
+    dbapi_connection.autocommit = autocommit
+
+
+def _begin_transaction(connection):
+    """Start transactions explicitly, as pysqlite's implicit BEGIN is disabled."""
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def test_engine(request):
+    """Create the test database once per test session."""
+    create_db = request.config.getoption("create_db")
+    persistent = _persistent_db(request.config)
+
+    if persistent:
+        # Reused databases live in a file so the schema survives between
+        # runs; by default on tmpfs, so file I/O still stays in memory
+        db_dir = os.environ.get("TEST_DB_DIR")
+        if not db_dir:
+            db_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        # One database per pytest-xdist worker, so parallel runs don't share
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        db_path = os.path.join(db_dir, f"insights-on-premise-test-{worker_id}.db")
+        SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_path}"
+    else:
+        # Use in-memory SQLite for testing; StaticPool hands every session
+        # the same connection, so they all see the same database. Each
+        # pytest-xdist worker process gets its own.
+        SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+
+    # TEST_DATABASE_URL points the tests at an external database (e.g.
+    # PostgreSQL in CI) instead
+    SQLALCHEMY_DATABASE_URL = os.environ.get(
+        "TEST_DATABASE_URL", SQLALCHEMY_DATABASE_URL
     )
 
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(
+            SQLALCHEMY_DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        event.listen(engine, "begin", _begin_transaction)
+    else:
+        # Batch executemany() calls into multi-row statements (psycopg2)
+        engine = create_engine(
+            SQLALCHEMY_DATABASE_URL,
+            executemany_mode="values_plus_batch",
+            insertmanyvalues_page_size=1000,
+        )
+
+        # pytest-xdist workers share the database, so each gets its own
+        # schema; otherwise one worker's uncommitted CREATE TABLE would
+        # block the others until its whole session rolls back
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker_id and engine.dialect.name == "postgresql":
+            schema = f"test_{worker_id}"
+            event.listen(engine, "connect", partial(_set_search_path, schema=schema))
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
 
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # A reused database keeps its (committed) schema, unless it is missing
+    # tables; all DDL runs on one connection in a single transaction
+    if persistent:
+        with engine.begin() as connection:
+            if create_db:
+                Base.metadata.drop_all(bind=connection)
+            schema_exists = not create_db and (
+                set(inspect(connection).get_table_names()) >= set(Base.metadata.tables)
+            )
+            if not schema_exists:
+                Base.metadata.create_all(bind=connection)
 
-    # Override the get_db dependency
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def test_connection(request, test_engine):
+    """
+    Open the connection shared by all tests, inside one outer transaction.
+
+    The outer transaction is never committed, so nothing the tests write
+    reaches the database. A throwaway schema is created inside it too and
+    disappears with the final rollback, without a drop_all.
+    """
+    connection = test_engine.connect()
+    transaction = connection.begin()
+
+    if not _persistent_db(request.config):
+        Base.metadata.create_all(bind=connection)
+
+    yield connection
+
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="function")
+def test_db(test_connection):
+    """
+    Provide a database session whose changes are rolled back after the test.
+
+    Each test runs in its own SAVEPOINT of the session-wide transaction;
+    commits made by the code under test only release a nested SAVEPOINT.
+    """
+    savepoint = test_connection.begin_nested()
+    # Like SessionLocal, keep loaded objects usable after commit without
+    # a reload
+    session = Session(
+        bind=test_connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+    # Override the get_db dependency so requests share the test's session
     def override_get_db():
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
+        yield session
 
     app.dependency_overrides[get_db] = override_get_db
 
-    yield TestingSessionLocal()
+    yield session
+
+    # Cleanup; other overrides (if any) belong to someone else
+    app.dependency_overrides.pop(get_db, None)
+    session.close()
+    savepoint.rollback()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create a test client shared by all tests."""
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run async tests (marked with pytest.mark.anyio) on asyncio only."""
+    return "asyncio"
 
-    # Cleanup
-    Base.metadata.drop_all(bind=engine)
-    app.dependency_overrides.clear()
 
-    # Remove test db file
-    if os.path.exists("./test.db"):
-        os.remove("./test.db")
+@pytest.fixture
+async def async_client():
+    """Create an async client calling the app in-process, without a server."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as client:
+        yield client
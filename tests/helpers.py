@@ -0,0 +1,83 @@
+"""Helpers for seeding the test database."""
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql import ClauseElement
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _inline_expressions(stmt, rows):
+    """
+    Render SQL expressions such as func.now() into an INSERT statement.
+
+    SQL expressions can't be bound parameters; they are taken from the
+    first row and must be the same for every row.
+
+    Args:
+        stmt: Insert statement
+        rows: Column value dictionaries, one per row
+
+    Returns:
+        Tuple of the statement and the rows without the rendered columns
+    """
+    expressions = {
+        key: value for key, value in rows[0].items() if isinstance(value, ClauseElement)
+    }
+    if not expressions:
+        return stmt, rows
+
+    rows = [
+        {key: value for key, value in row.items() if key not in expressions}
+        for row in rows
+    ]
+    return stmt.values(expressions), rows
+
+
+def bulk_seed(session, model, rows):
+    """
+    Insert test rows in bulk.
+
+    Rows are passed to a single executemany INSERT, which SQLAlchemy
+    batches into multi-row statements (insertmanyvalues) instead of one
+    round-trip per row. SQL expressions such as func.now() are rendered
+    into the statement and evaluated by the database; they must be the
+    same for every row.
+
+    Args:
+        session: Database session
+        model: Model class to insert into
+        rows: Column value dictionaries, one per row
+    """
+    stmt, rows = _inline_expressions(insert(model), rows)
+    session.execute(stmt, rows)
+    session.commit()
+
+
+def upsert_many(session, model, rows, index_elements):
+    """
+    Insert or update test rows in a single INSERT ... ON CONFLICT statement.
+
+    Conflicting rows get all their other seeded columns overwritten. SQL
+    expressions are handled as in bulk_seed.
+
+    Args:
+        session: Database session (PostgreSQL or SQLite)
+        model: Model class to insert into
+        rows: Column value dictionaries, one per row
+        index_elements: Columns of the unique index that detects conflicts
+    """
+    stmt = _UPSERT_INSERTS[session.get_bind().dialect.name](model)
+    update_columns = [c for c in rows[0] if c not in index_elements]
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+    stmt, rows = _inline_expressions(stmt, rows)
+    session.execute(stmt, rows)
+    session.commit()
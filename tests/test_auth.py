@@ -3,7 +3,7 @@ import base64
 import json
 import pytest
 
-from app.auth import decode_identity_header, AuthenticationError
+from app.auth import decode_identity_header, resolve_identity, AuthenticationError
 
 
 def test_decode_valid_identity_header():
@@ -55,3 +55,23 @@ def test_decode_invalid_structure():
 
     with pytest.raises(AuthenticationError):
         decode_identity_header(encoded)
+
+
+def test_resolve_identity_is_cached():
+    """Test that resolved identities are memoized by header value."""
+    identity_data = {
+        "identity": {
+            "account_number": "12345",
+            "org_id": "67890",
+            "type": "User"
+        }
+    }
+    encoded = base64.b64encode(json.dumps(identity_data).encode()).decode()
+
+    resolve_identity.cache_clear()
+    assert resolve_identity(encoded) == (67890, "12345")
+    assert resolve_identity(encoded) == (67890, "12345")
+
+    cache_info = resolve_identity.cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 1
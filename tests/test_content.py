@@ -0,0 +1,22 @@
+"""Tests for the content endpoint and content parsing."""
+from app.content_parser_yaml import YAMLContentParser
+
+
+def test_content_endpoint_etag(client):
+    """Test content endpoint returns 304 for a matching If-None-Match."""
+    response = client.get("/api/v1/content")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/content", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_parse_error_key_directory_crlf(tmp_path):
+    """Test markdown with CRLF line endings is read with plain newlines."""
+    (tmp_path / "reason.md").write_bytes(b"First line\r\nSecond line\r\n")
+
+    content = YAMLContentParser(str(tmp_path))._parse_error_key_directory(tmp_path)
+
+    assert content == {"reason": "First line\nSecond line"}
@@ -1,78 +1,93 @@
 """Tests for new API endpoints (clusters/reports and content)."""
 import base64
 import json
-from datetime import datetime
 
 import pytest
-from fastapi.testclient import TestClient
+from sqlalchemy import func
 
+from app.content_service import ContentService
 from app.main import app
-from app.database import get_db
-from app.models import Report, RuleHit, RuleContent
+from app.models import Report, RuleHit
+from tests.helpers import bulk_seed, upsert_many
 
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+# Encoded once at import; the header is the same for every test
+VALID_IDENTITY = {
+    "identity": {
+        "account_number": "12345",
+        "org_id": "67890",
+        "type": "User",
+    }
+}
+VALID_IDENTITY_HEADER = {
+    "x-rh-identity": base64.b64encode(json.dumps(VALID_IDENTITY).encode()).decode()
+}
 
+RULE_FQDN = "ccx_rules_ocp.external.rules.security_check"
+ERROR_KEY = "CVE_DETECTED"
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def valid_identity_header():
     """Generate valid x-rh-identity header."""
-    identity = {
-        "identity": {
-            "account_number": "12345",
-            "org_id": "67890",
-            "type": "User",
-        }
-    }
-    encoded = base64.b64encode(json.dumps(identity).encode()).decode()
-    return {"x-rh-identity": encoded}
+    return VALID_IDENTITY_HEADER
 
 
 @pytest.fixture
-def db_session():
-    """Get database session for tests."""
-    db = next(get_db())
-    yield db
-    db.close()
+def db_session(test_db):
+    """Get the database session the app uses during the test."""
+    return test_db
+
+
+@pytest.fixture
+def content_service(tmp_path, monkeypatch):
+    """Serve rule content from a temporary rules-content directory."""
+    error_key_dir = tmp_path / "external" / "rules" / "security_check" / ERROR_KEY
+    error_key_dir.mkdir(parents=True)
+    (error_key_dir.parent / "plugin.yaml").write_text(
+        "plugin:\n  name: Security check\n"
+    )
+    (error_key_dir / "metadata.yaml").write_text(
+        "total_risk: 4\nlikelihood: 3\nimpact: 4\ntags:\n  - security\n  - critical\n"
+    )
+    (error_key_dir / "generic.md").write_text("Critical security issue")
+    (error_key_dir / "reason.md").write_text("Vulnerability detected")
+    (error_key_dir / "resolution.md").write_text("Update immediately")
+
+    service = ContentService(str(tmp_path))
+    monkeypatch.setattr(app.state, "content_service", service, raising=False)
+    return service
 
 
 def test_clusters_reports_endpoint_no_auth(client):
     """Test clusters/reports endpoint without authentication."""
-    response = client.post(
-        "/api/v1/organizations/67890/clusters/reports",
-        json={"clusters": ["test-cluster-1"]},
-    )
+    response = client.get("/api/v1/clusters/reports")
     assert response.status_code == 422  # Missing x-rh-identity header
 
 
-def test_clusters_reports_endpoint_org_mismatch(client, valid_identity_header):
-    """Test clusters/reports endpoint with org ID mismatch."""
-    response = client.post(
-        "/api/v1/organizations/99999/clusters/reports",
-        headers=valid_identity_header,
-        json={"clusters": ["test-cluster-1"]},
+def test_clusters_reports_endpoint_invalid_identity(client):
+    """Test clusters/reports endpoint with an undecodable identity header."""
+    response = client.get(
+        "/api/v1/clusters/reports",
+        headers={"x-rh-identity": "not-base64-json"},
     )
     assert response.status_code == 401
-    assert "does not match" in response.json()["detail"]
 
 
-def test_clusters_reports_endpoint_empty_results(client, valid_identity_header):
+def test_clusters_reports_endpoint_empty_results(
+    client, valid_identity_header, db_session
+):
     """Test clusters/reports endpoint with no data."""
-    response = client.post(
-        "/api/v1/organizations/67890/clusters/reports",
-        headers=valid_identity_header,
-        json={"clusters": ["non-existent-cluster"]},
-    )
+    response = client.get("/api/v1/clusters/reports", headers=valid_identity_header)
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
     assert data["clusters"] == {}
 
 
-def test_clusters_reports_endpoint_with_data(client, valid_identity_header, db_session):
+def test_clusters_reports_endpoint_with_data(
+    client, valid_identity_header, db_session, content_service
+):
     """Test clusters/reports endpoint with actual data."""
     # Create test data
     org_id = 67890
@@ -80,55 +95,68 @@ def test_clusters_reports_endpoint_with_data(client, valid_identity_header, db_s
 
     # Insert a report
     report_data = {"analysis": "test", "findings": []}
-    Report.upsert(
+    upsert_many(
         db_session,
-        org_id=org_id,
-        cluster=cluster_id,
-        report=json.dumps(report_data),
-        gathered_at=datetime.utcnow(),
+        Report,
+        [
+            {
+                "org_id": org_id,
+                "cluster": cluster_id,
+                "report": report_data,
+                "gathered_at": func.now(),
+            }
+        ],
+        index_elements=["org_id", "cluster"],
     )
 
-    # Insert rule content (normalized table)
-    RuleContent.upsert(
+    # Insert rule hits (reference rule content served from files); the
+    # second one has no content
+    bulk_seed(
         db_session,
-        rule_fqdn="test.rule.check",
-        error_key="TEST_ERROR",
-        description="Test rule",
-        impact=2,
+        RuleHit,
+        [
+            {
+                "org_id": org_id,
+                "cluster_id": cluster_id,
+                "rule_fqdn": rule_fqdn,
+                "error_key": ERROR_KEY,
+                "updated_at": func.now(),
+            }
+            for rule_fqdn in (RULE_FQDN, "unknown.rule")
+        ],
     )
 
-    # Insert a rule hit (references rule content)
-    RuleHit.upsert(
+    # Reports of other organizations are not returned
+    upsert_many(
         db_session,
-        org_id=org_id,
-        cluster_id=cluster_id,
-        rule_fqdn="test.rule.check",
-        error_key="TEST_ERROR",
+        Report,
+        [{"org_id": 1, "cluster": "other-cluster", "report": {}}],
+        index_elements=["org_id", "cluster"],
     )
 
     # Query the endpoint
-    response = client.post(
-        "/api/v1/organizations/67890/clusters/reports",
-        headers=valid_identity_header,
-        json={"clusters": [cluster_id]},
-    )
+    response = client.get("/api/v1/clusters/reports", headers=valid_identity_header)
 
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
-    assert cluster_id in data["clusters"]
+    assert list(data["clusters"]) == [cluster_id]
 
     cluster_data = data["clusters"][cluster_id]
     assert cluster_data["cluster_id"] == cluster_id
     assert cluster_data["org_id"] == org_id
     assert cluster_data["report"] == report_data
-    assert len(cluster_data["rule_hits"]) == 1
+    assert cluster_data["gathered_at"] is not None
 
-    rule_hit = cluster_data["rule_hits"][0]
-    assert rule_hit["rule_fqdn"] == "test.rule.check"
-    assert rule_hit["error_key"] == "TEST_ERROR"
-    assert rule_hit["template_data"]["description"] == "Test rule"
-    assert rule_hit["template_data"]["impact"] == 2
+    rule_hits = {hit["rule_fqdn"]: hit for hit in cluster_data["rule_hits"]}
+    assert set(rule_hits) == {RULE_FQDN, "unknown.rule"}
+
+    rule_hit = rule_hits[RULE_FQDN]
+    assert rule_hit["error_key"] == ERROR_KEY
+    assert rule_hit["updated_at"] is not None
+    assert rule_hit["template_data"]["description"] == "Critical security issue"
+    assert rule_hit["template_data"]["impact"] == 4
+    assert rule_hits["unknown.rule"]["template_data"]["description"] == ""
 
 
 def test_content_endpoint(client):
@@ -141,41 +169,24 @@ def test_content_endpoint(client):
     assert isinstance(data["content"], list)
 
 
-def test_content_endpoint_with_data(client, db_session):
+def test_content_endpoint_with_data(client, content_service):
     """Test content endpoint with actual rule data."""
-    # Create test rule content directly in the normalized table
-    RuleContent.upsert(
-        db_session,
-        rule_fqdn="security.vulnerability.check",
-        error_key="CVE_DETECTED",
-        description="Critical security issue",
-        reason="Vulnerability detected",
-        resolution="Update immediately",
-        total_risk=4,
-        likelihood=3,
-        impact=4,
-        tags=json.dumps(["security", "critical"]),
-    )
-
     # Query the endpoint
     response = client.get("/api/v1/content")
 
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
-    assert len(data["content"]) > 0
-
-    # Find our rule in the content
-    rule_found = False
-    for rule in data["content"]:
-        if rule["rule_fqdn"] == "security.vulnerability.check":
-            rule_found = True
-            assert rule["error_key"] == "CVE_DETECTED"
-            assert rule["description"] == "Critical security issue"
-            assert rule["total_risk"] == 4
-            assert rule["likelihood"] == 3
-            assert rule["impact"] == 4
-            assert "security" in rule["tags"]
-            break
-
-    assert rule_found, "Test rule not found in content response"
+    assert len(data["content"]) == 1
+
+    rule = data["content"][0]
+    assert rule["plugin"]["python_module"] == RULE_FQDN
+    assert rule["reason"] == "Vulnerability detected"
+    assert rule["resolution"] == "Update immediately"
+
+    error_key = rule["error_keys"][ERROR_KEY]
+    assert error_key["total_risk"] == 4
+    assert error_key["metadata"]["description"] == "Critical security issue"
+    assert error_key["metadata"]["likelihood"] == 3
+    assert error_key["metadata"]["impact"] == "Critical Impact"
+    assert "security" in error_key["metadata"]["tags"]
@@ -0,0 +1,182 @@
+"""Tests for the archive processor."""
+import io
+import json
+import tarfile
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app.models import Report, ReportInfo, RuleHit
+from app.processor import ArchiveProcessor, archive_content_size
+
+ORG_ID = 67890
+
+
+@pytest.fixture
+def processor(test_db):
+    """
+    Create a processor writing to the test session.
+
+    Saving results only needs the session and the org ID, so the
+    insights-core components loaded by __init__ are skipped.
+    """
+    processor = ArchiveProcessor.__new__(ArchiveProcessor)
+    processor.db = test_db
+    processor.org_id = ORG_ID
+    return processor
+
+
+def write_tar(path, mode, files):
+    """Write a tar archive with the given file names and contents."""
+    with tarfile.open(path, mode) as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def write_zip(path, files):
+    """Write a zip archive with the given file names and contents."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+
+
+ARCHIVE_FILES = {"a.txt": b"a" * 100, "b.txt": b"b" * 200, "c.txt": b"c" * 300}
+
+
+def results_json(*rules):
+    """Build insights-core JSON results hitting the given rules."""
+    return json.dumps({rule: {"description": rule} for rule in rules})
+
+
+def rule_hits(db):
+    """Get the stored rule hits as (cluster_id, rule_fqdn) pairs."""
+    return {(hit.cluster_id, hit.rule_fqdn) for hit in db.query(RuleHit)}
+
+
+def test_save_results_deletes_stale_hits(processor, test_db):
+    """Test saving results removes hits no longer reported for the cluster."""
+    processor.save_results("cluster-1", results_json("rule.a", "rule.b"), {})
+    processor.save_results("cluster-2", results_json("rule.a"), {})
+
+    assert processor.save_results("cluster-1", results_json("rule.a"), {}) == 1
+
+    assert rule_hits(test_db) == {("cluster-1", "rule.a"), ("cluster-2", "rule.a")}
+
+
+def test_save_results_batch_last_wins(processor, test_db):
+    """Test a cluster repeated within a batch keeps its last results."""
+    saved = processor.save_results_batch(
+        [
+            ("cluster-1", results_json("rule.a", "rule.b"), {"version": 1}),
+            ("cluster-2", results_json("rule.c"), {"version": 1}),
+            ("cluster-1", results_json("rule.d"), {"version": 2}),
+        ]
+    )
+
+    assert saved == {"cluster-1": 1, "cluster-2": 1}
+    assert rule_hits(test_db) == {("cluster-1", "rule.d"), ("cluster-2", "rule.c")}
+
+    report = test_db.query(Report).filter_by(cluster="cluster-1").one()
+    assert report.report["results"] == {"rule.d": {"description": "rule.d"}}
+    report_info = test_db.query(ReportInfo).filter_by(cluster_id="cluster-1").one()
+    assert report_info.version_info == {"version": 2}
+
+
+def test_save_results_batch_deletes_stale_hits(processor, test_db):
+    """Test a batch removes stale hits of every cluster in it, and only those."""
+    processor.save_results_batch(
+        [
+            ("cluster-1", results_json("rule.a", "rule.b"), {}),
+            ("cluster-2", results_json("rule.a", "rule.c"), {}),
+            ("cluster-3", results_json("rule.a"), {}),
+        ]
+    )
+
+    processor.save_results_batch(
+        [
+            ("cluster-1", results_json("rule.b"), {}),
+            ("cluster-2", results_json("rule.a", "rule.d"), {}),
+        ]
+    )
+
+    assert rule_hits(test_db) == {
+        ("cluster-1", "rule.b"),
+        ("cluster-2", "rule.a"),
+        ("cluster-2", "rule.d"),
+        ("cluster-3", "rule.a"),
+    }
+
+
+def test_save_results_batch_empty_results(processor, test_db):
+    """Test empty results remove all hits of the cluster."""
+    processor.save_results_batch(
+        [
+            ("cluster-1", results_json("rule.a", "rule.b"), {}),
+            ("cluster-2", results_json("rule.a"), {}),
+        ]
+    )
+
+    saved = processor.save_results_batch([("cluster-1", "{}", {})])
+
+    assert saved == {"cluster-1": 0}
+    assert rule_hits(test_db) == {("cluster-2", "rule.a")}
+
+
+def test_archive_content_size_tar(tmp_path):
+    """Test uncompressed tar archives are measured from member headers."""
+    path = tmp_path / "archive.tar"
+    write_tar(path, "w", ARCHIVE_FILES)
+
+    assert archive_content_size(str(path)) == 600
+    # Stops at the first member reaching the limit
+    assert archive_content_size(str(path), limit=250) == 300
+
+
+def test_archive_content_size_zip(tmp_path):
+    """Test zip archives are measured from their central directory."""
+    path = tmp_path / "archive.zip"
+    write_zip(path, ARCHIVE_FILES)
+
+    assert archive_content_size(str(path)) == 600
+    assert archive_content_size(str(path), limit=250) == 300
+
+
+@pytest.mark.parametrize("name", ["archive.tar.gz", "archive.txt"])
+def test_archive_content_size_not_inspected(tmp_path, name):
+    """Test compressed tar archives and unknown formats are not inspected."""
+    path = tmp_path / name
+    if name.endswith(".tar.gz"):
+        write_tar(path, "w:gz", ARCHIVE_FILES)
+    else:
+        path.write_bytes(b"not an archive")
+
+    assert archive_content_size(str(path)) is None
+
+
+@pytest.mark.parametrize(
+    "limit,expected", [(-1, True), (601, True), (600, False), (100, False)]
+)
+def test_validate_archive_size(processor, tmp_path, limit, expected):
+    """Test archives reaching the unpacked size limit are rejected."""
+    path = tmp_path / "archive.tar"
+    write_tar(path, "w", ARCHIVE_FILES)
+    processor.unpacked_archive_size_limit = limit
+
+    assert processor.validate_archive_size(str(path)) is expected
+
+
+def test_report_upsert_many_keeps_gathered_at(test_db):
+    """Test re-saving reports without gathered_at keeps the stored value."""
+    gathered_at = datetime(2024, 1, 1)
+    Report.upsert_many(
+        test_db, ORG_ID, {"cluster-1": {"v": 1}}, gathered_at=gathered_at
+    )
+
+    Report.upsert_many(test_db, ORG_ID, {"cluster-1": {"v": 2}})
+
+    report = test_db.query(Report).filter_by(cluster="cluster-1").one()
+    assert report.report == {"v": 2}
+    assert report.gathered_at == gathered_at
@@ -1,18 +1,18 @@
 """Tests for upload endpoint."""
 import base64
 import json
+from functools import lru_cache
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
 import pytest
-from fastapi.testclient import TestClient
 
-from app.main import app
-
-client = TestClient(app)
+from app.main import UploadTooLargeError, save_upload, settings
 
 
+@lru_cache(maxsize=None)
 def create_identity_header(account_number="12345", org_id="67890"):
-    """Helper to create x-rh-identity header."""
+    """Helper to create x-rh-identity header (encoded once per identity)."""
     identity_data = {
         "identity": {
             "account_number": account_number,
@@ -24,54 +24,129 @@ def create_identity_header(account_number="12345", org_id="67890"):
     return base64.b64encode(identity_json.encode()).decode()
 
 
-def test_health_endpoint():
-    """Test health check endpoint."""
-    response = client.get("/health")
-    assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
-
-
-def test_root_endpoint():
-    """Test root endpoint."""
-    response = client.get("/")
+# Upload payload shared by all tests; httpx takes bytes as they are
+TEST_FILE_BYTES = b"test data"
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/health", {"status": "healthy"}),
+        (
+            "/",
+            {"service": "insights-on-premise", "status": "running", "version": "1.0.0"},
+        ),
+    ],
+    ids=["health", "root"],
+)
+def test_status_endpoints(client, path, expected):
+    """Test health check and root endpoints."""
+    response = client.get(path)
     assert response.status_code == 200
-    data = response.json()
-    assert data["service"] == "insights-on-premise"
-    assert data["status"] == "running"
+    assert response.json() == expected
 
 
-def test_upload_missing_identity_header():
+@pytest.mark.anyio
+async def test_upload_missing_identity_header(async_client):
     """Test upload without x-rh-identity header."""
-    files = {"file": ("test.tar.gz", BytesIO(b"test data"), "application/gzip")}
-    response = client.post("/api/ingress/v1/upload", files=files)
+    files = {"upload": ("test.tar.gz", TEST_FILE_BYTES, "application/gzip")}
+    response = await async_client.post("/api/ingress/v1/upload", files=files)
 
     assert response.status_code == 422  # Validation error
 
 
-def test_upload_invalid_file_format():
+@pytest.mark.anyio
+async def test_upload_invalid_file_format(async_client):
     """Test upload with invalid file format."""
     identity = create_identity_header()
-    files = {"file": ("test.txt", BytesIO(b"test data"), "text/plain")}
+    files = {"upload": ("test.txt", TEST_FILE_BYTES, "text/plain")}
 
-    response = client.post(
+    response = await async_client.post(
         "/api/ingress/v1/upload",
         files=files,
         headers={"x-rh-identity": identity}
     )
 
     assert response.status_code == 400
-    assert "tar.gz" in response.json()["detail"].lower()
+    assert "tar.gz" in response.json()["error"].lower()
 
 
-def test_upload_no_filename():
+@pytest.mark.anyio
+async def test_upload_no_filename(async_client):
     """Test upload without filename."""
     identity = create_identity_header()
-    files = {"file": ("", BytesIO(b"test data"), "application/gzip")}
+    files = {"upload": ("", TEST_FILE_BYTES, "application/gzip")}
+
+    response = await async_client.post(
+        "/api/ingress/v1/upload",
+        files=files,
+        headers={"x-rh-identity": identity}
+    )
+
+    # A multipart part without a filename is a plain form field, not a
+    # file, so request validation rejects it
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_upload_too_large(async_client, monkeypatch, tmp_path):
+    """Test upload larger than the maximum file size."""
+    monkeypatch.setattr(settings, "max_file_size", len(TEST_FILE_BYTES) - 1)
+    monkeypatch.setattr(settings, "temp_upload_dir", str(tmp_path))
+    identity = create_identity_header()
+    files = {"upload": ("test.tar.gz", TEST_FILE_BYTES, "application/gzip")}
 
-    response = client.post(
+    response = await async_client.post(
         "/api/ingress/v1/upload",
         files=files,
         headers={"x-rh-identity": identity}
     )
 
     assert response.status_code == 400
+    assert "exceeds maximum" in response.json()["error"]
+    # The partial upload is cleaned up
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_upload_in_memory(tmp_path):
+    """Test copying an upload held in memory, enforcing the size limit."""
+    destination = tmp_path / "upload.tar.gz"
+
+    with open(destination, "wb") as f:
+        copied = save_upload(BytesIO(TEST_FILE_BYTES), f, len(TEST_FILE_BYTES))
+    assert copied == len(TEST_FILE_BYTES)
+    assert destination.read_bytes() == TEST_FILE_BYTES
+
+    with open(destination, "wb") as f, pytest.raises(UploadTooLargeError):
+        save_upload(BytesIO(TEST_FILE_BYTES), f, len(TEST_FILE_BYTES) - 1)
+
+
+def test_save_upload_rolled_spool(tmp_path):
+    """Test copying an upload spooled to disk, enforcing the size limit."""
+    destination = tmp_path / "upload.tar.gz"
+    source = SpooledTemporaryFile(max_size=1)
+    source.write(TEST_FILE_BYTES)
+    assert source._rolled
+
+    with source:
+        with open(destination, "wb") as f:
+            assert save_upload(source, f, len(TEST_FILE_BYTES)) == len(TEST_FILE_BYTES)
+        assert destination.read_bytes() == TEST_FILE_BYTES
+
+        with open(destination, "wb") as f, pytest.raises(UploadTooLargeError):
+            save_upload(source, f, len(TEST_FILE_BYTES) - 1)
+
+
+def test_save_upload_rolled_spool_short_copy(tmp_path, monkeypatch):
+    """Test a spooled upload copied only partially raises instead of truncating."""
+    # Copy the first 4 bytes, then report end of file
+    monkeypatch.setattr(
+        "app.main.os.sendfile",
+        lambda out_fd, in_fd, offset, count: 4 if offset == 0 else 0,
+    )
+    source = SpooledTemporaryFile(max_size=1)
+    source.write(TEST_FILE_BYTES)
+
+    with source, open(tmp_path / "upload.tar.gz", "wb") as f:
+        with pytest.raises(OSError):
+            save_upload(source, f, len(TEST_FILE_BYTES))